@@ -1,12 +1,15 @@
 from flask import Flask
 from flask_cors import CORS
+from flask_compress import Compress
 from flask_sqlalchemy import SQLAlchemy
 from app.config import get_config
+from app.json_provider import OrjsonProvider
 
 db = SQLAlchemy()
 
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     config = get_config()
     app.config.from_object(config)
@@ -16,18 +19,37 @@ def create_app():
     db.init_app(app)
     
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
+    Compress(app)
     
     from app.routes import api_bp
     app.register_blueprint(api_bp, url_prefix='/api/v1')
     
+    @app.cli.command('rebuild-stat-counters')
+    def rebuild_stat_counters_command():
+        """Recount the dashboard counters from the source tables."""
+        from app.queries import rebuild_stat_counters
+        rebuild_stat_counters()
+    
     with app.app_context():
         db.create_all()
+        from app.queries import backfill_stat_counters
+        # Seed the dashboard counters on first start; they are kept current on write
+        backfill_stat_counters()
+        if app.config['SQL_STATEMENT_WARN_THRESHOLD'] is not None:
+            from app.queries import register_query_counter
+            register_query_counter(app, db.engine, app.config['SQL_STATEMENT_WARN_THRESHOLD'])
     
     from app.background_processor import background_processor
     from app.sse_manager import sse_manager
+    from app.cache import dashboard_cache
     
+    if app.config['REDIS_URL']:
+        sse_manager.configure_fanout(app.config['REDIS_URL'])
+    sse_manager.register_session_hooks(db.session)
+    dashboard_cache.register_session_hooks(db.session)
     background_processor.set_sse_manager(sse_manager)
     background_processor.set_app(app)
-    background_processor.start()
+    if app.config['BACKGROUND_PROCESSOR_AUTOSTART']:
+        background_processor.start()
     
     return app
\ No newline at end of file
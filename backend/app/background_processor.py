@@ -1,25 +1,36 @@
 """Background processing system for async feedback processing."""
 
+import os
 import threading
 import logging
-from queue import Queue
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full
+from typing import List, Optional
+from sqlalchemy import update
 from app import db
 from app.models import Feedback
-from app.queries import get_feedback_with_relations
+from app.queries import get_feedback_with_relations, get_feedbacks_with_relations
 from app.services.feedback_processor import FeedbackProcessor
 
 logger = logging.getLogger(__name__)
 
+# Feedback items processed in parallel; bounds concurrent calls to external APIs
+MAX_WORKERS = int(os.environ.get('BG_WORKERS', '4'))
+# Pending items beyond this are refused at submission (backpressure)
+MAX_QUEUE_SIZE = int(os.environ.get('BG_QUEUE_SIZE', '1000'))
+
 def _get_feedback_with_relations(feedback_id):
     return get_feedback_with_relations(feedback_id)
 
 class BackgroundProcessor:
     
     def __init__(self):
-        self.processing_queue = Queue()
+        self.processing_queue = Queue(maxsize=MAX_QUEUE_SIZE)
         self.feedback_processor = FeedbackProcessor()
         self.worker_thread: Optional[threading.Thread] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        # Held per in-flight item so waiting work stays in the bounded queue
+        self._slots = threading.BoundedSemaphore(MAX_WORKERS)
         self.is_running = False
         self.sse_manager = None
         self.app = None
@@ -38,6 +49,7 @@ class BackgroundProcessor:
             return
             
         self.is_running = True
+        self.executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="feedback-worker")
         self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
         self.worker_thread.start()
         logger.info("Background processor started")
@@ -46,13 +58,29 @@ class BackgroundProcessor:
         """Stop the background processing worker."""
         self.is_running = False
         if self.worker_thread:
+            # Sentinel unblocks the worker's blocking get()
+            try:
+                self.processing_queue.put(None, timeout=5)
+            except Full:
+                logger.warning("Processing queue full; worker not signalled to stop")
             self.worker_thread.join(timeout=5)
+        if self.executor:
+            self.executor.shutdown(wait=True)
         logger.info("Background processor stopped")
         
-    def queue_feedback_processing(self, feedback_id: str):
-        """Queue feedback for background processing."""
-        self.processing_queue.put(feedback_id)
-        logger.info(f"Queued feedback {feedback_id} for processing")
+    def queue_feedback_processing(self, feedback_id: str) -> bool:
+        """Queue feedback for background processing.
+        
+        Never blocks: when the queue is full the feedback is marked 'failed'
+        (it will not be processed) and False is returned.
+        """
+        try:
+            self.processing_queue.put_nowait(feedback_id)
+        except Full:
+            logger.warning("Processing queue full; feedback %s not queued", feedback_id)
+            self._update_feedback_statuses([feedback_id], 'failed')
+            return False
+        logger.info("Queued feedback %s for processing", feedback_id)
         
         if self.sse_manager and self.app:
             with self.app.app_context():
@@ -61,53 +89,68 @@ class BackgroundProcessor:
                     if feedback and self.sse_manager:
                         self.sse_manager.send_feedback_update(feedback)
                 except Exception as e:
-                    logger.error(f"Failed to send immediate SSE update: {str(e)}")
+                    logger.error("Failed to send immediate SSE update: %s", e)
+        return True
         
     def _worker_loop(self):
-        """Main worker loop for processing feedback."""
-        while self.is_running:
+        """Main worker loop: hand each queued item to the pool as soon as a slot frees up."""
+        while True:
+            feedback_id = self.processing_queue.get()
+            if feedback_id is None:
+                self.processing_queue.task_done()
+                break
+            # Items finish independently, so one slow API call only holds its own slot
+            self._slots.acquire()
             try:
-                feedback_id = self.processing_queue.get(timeout=1)
-                self._process_feedback(feedback_id)
+                self.executor.submit(self._process_feedback, feedback_id)
+            except Exception as e:
+                logger.error("Failed to schedule feedback %s: %s", feedback_id, e)
+                self._slots.release()
                 self.processing_queue.task_done()
-            except:
-                continue
                 
     def _process_feedback(self, feedback_id: str):
-        """Process a single feedback item."""
-        if not self.app:
-            logger.error("No Flask app context available for background processing")
-            return
-            
-        with self.app.app_context():
-            try:
-                logger.info(f"Starting processing for feedback {feedback_id}")
-                
-                feedback = _get_feedback_with_relations(feedback_id)
-                if feedback and self.sse_manager:
-                    feedback.processing_status = 'processing'
-                    db.session.commit()
-                    self.sse_manager.send_feedback_update(feedback)
-                
-                success = self.feedback_processor.process_feedback_complete(feedback_id)
-                self._update_feedback_status(feedback_id, 'completed' if success else 'failed')
-                logger.info(f"Feedback {feedback_id} processing {'completed' if success else 'failed'}")
-            except Exception as e:
-                logger.error(f"Error processing feedback {feedback_id}: {str(e)}")
-                self._update_feedback_status(feedback_id, 'failed')
+        """Run the pipeline for one item on a pool thread with its own session."""
+        try:
+            if not self.app:
+                logger.error("No Flask app context available for background processing")
+                return
+            with self.app.app_context():
+                # Rows are inserted as 'processing' and clients got that state from
+                # queue_feedback_processing, so no status write happens up front;
+                # success is marked 'completed' in the processor's own commit
+                try:
+                    success = self.feedback_processor.process_feedback_complete(feedback_id)
+                except Exception as e:
+                    logger.error("Error processing feedback %s: %s", feedback_id, e)
+                    db.session.rollback()
+                    success = False
+                if not success:
+                    self._update_feedback_statuses([feedback_id], 'failed')
+                logger.info("Feedback %s processing %s", feedback_id, 'completed' if success else 'failed')
+        finally:
+            self._slots.release()
+            self.processing_queue.task_done()
     
-    def _update_feedback_status(self, feedback_id: str, status: str):
-        """Update feedback status and send real-time update."""
+    def _update_feedback_statuses(self, feedback_ids: List[str], status: str):
+        """Set the status with a single UPDATE and send real-time updates."""
         try:
-            feedback = _get_feedback_with_relations(feedback_id)
-            if feedback:
-                feedback.processing_status = status
-                db.session.commit()
-                if self.sse_manager:
-                    self.sse_manager.send_feedback_update(feedback)
-            else:
-                logger.error(f"Feedback {feedback_id} not found in database")
+            result = db.session.execute(
+                update(Feedback)
+                .where(Feedback.id.in_(feedback_ids))
+                .values(processing_status=status)
+            )
+            db.session.commit()
+            
+            if result.rowcount != len(feedback_ids):
+                logger.error("Only %s of %s feedback rows found for status '%s'", result.rowcount, len(feedback_ids), status)
+            
+            # Only hydrate the full rows when someone is listening
+            if self.sse_manager and self.sse_manager.has_subscribers():
+                feedbacks = get_feedbacks_with_relations(feedback_ids)
+                if feedbacks:
+                    self.sse_manager.send_feedback_updates(feedbacks)
         except Exception as e:
-            logger.error(f"Failed to update feedback status: {str(e)}")
+            db.session.rollback()
+            logger.error("Failed to update feedback status: %s", e)
 
 background_processor = BackgroundProcessor()
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Small in-process caches for read-heavy endpoints and repeated API calls."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from sqlalchemy import event
+
+
+class TTLCache:
+    
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._generation = 0
+        self.lock = threading.Lock()
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, computing it on a miss or after expiry."""
+        now = time.monotonic()
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+            generation = self._generation
+        
+        value = compute()
+        
+        with self.lock:
+            # Don't store a value computed before an invalidation landed
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        return value
+    
+    def invalidate(self):
+        """Drop all entries, e.g. after feedback rows change."""
+        with self.lock:
+            self._generation += 1
+            self._entries.clear()
+    
+    def register_session_hooks(self, session):
+        """Invalidate whenever `session` commits a write."""
+        event.listen(session, 'after_commit', lambda s: self.invalidate())
+
+
+class LRUCache:
+    """Bounded, thread-safe mapping that evicts the least recently used key."""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the value for `key` (marking it recently used), or None."""
+        with self.lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        with self.lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Dashboard aggregates change only when feedback is written; the TTL bounds
+# staleness across gunicorn workers, whose commits don't invalidate each other
+dashboard_cache = TTLCache(ttl_seconds=5)
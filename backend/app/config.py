@@ -26,8 +26,32 @@ class Config:
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-4o')
     
+    # gunicorn.conf.py turns this off and starts the processor per worker in post_fork
+    BACKGROUND_PROCESSOR_AUTOSTART = os.environ.get('BACKGROUND_PROCESSOR_AUTOSTART', 'true').lower() == 'true'
+    
+    # Redis Pub/Sub for SSE fan-out across gunicorn workers/replicas; unset keeps it in-process
+    REDIS_URL = os.environ.get('REDIS_URL')
+    
+    # Log requests issuing more SQL statements than this (None disables the check)
+    SQL_STATEMENT_WARN_THRESHOLD = None
+    
+    # Flask-Compress: JSON only; SSE must not be buffered and audio is already compressed
+    COMPRESS_MIMETYPES = ['application/json']
+    # Compressing a streamed response buffers it whole, which undoes the streamed list
+    COMPRESS_STREAMS = False
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_LEVEL = 4
+    COMPRESS_BR_LEVEL = 4
+    
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
     AUDIO_FILES_DIR = '/tmp'
+    # Let a fronting nginx/Apache sendfile(2) local audio via X-Sendfile instead of
+    # streaming it through the worker; without a proxy, gunicorn's wsgi.file_wrapper
+    # already uses sendfile for send_file() responses
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+    # nginx equivalent: an internal location (e.g. '/_internal_audio/') aliased to
+    # AUDIO_FILES_DIR; when set, local audio is handed off via X-Accel-Redirect
+    AUDIO_ACCEL_REDIRECT_PREFIX = os.environ.get('AUDIO_ACCEL_REDIRECT_PREFIX')
     
     @classmethod
     def validate_config(cls) -> Dict[str, Any]:
@@ -45,6 +69,8 @@ class Config:
 class DevelopmentConfig(Config):
     DEBUG = True
     TESTING = False
+    # feedback detail: row + 3 selectinload queries
+    SQL_STATEMENT_WARN_THRESHOLD = 4
 
 
 class ProductionConfig(Config):
@@ -60,6 +86,8 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SECRET_KEY = 'test-secret-key'
+    # Registers the statement counter; tests/test_query_counts.py asserts per-endpoint budgets
+    SQL_STATEMENT_WARN_THRESHOLD = 4
 
 
 config_by_name = {
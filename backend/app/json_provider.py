@@ -0,0 +1,27 @@
+"""orjson-backed JSON provider for Flask responses."""
+
+from typing import Any
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize to a JSON string (used by `flask.json.dumps`)."""
+        return self.dumps_bytes(obj).decode()
+    
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """Serialize straight to bytes, skipping the intermediate str."""
+        return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS)
+    
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        """Deserialize JSON request bodies."""
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        """Build a JSON response without a bytes -> str -> bytes round-trip."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
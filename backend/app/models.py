@@ -1,10 +1,25 @@
 from app import db
 from datetime import datetime, timezone
 from sqlalchemy import Index
-import uuid
+import os
+import time
+
+# Version 7 nibble and RFC 4122 variant bits of a 128-bit UUID
+_UUID7_CLEAR_MASK = ~((0xF << 76) | (0x3 << 62))
+_UUID7_SET_BITS = (0x7 << 76) | (0x2 << 62)
+
 
 def generate_uuid():
-    return str(uuid.uuid4())
+    """Time-ordered UUID string (RFC 9562 version 7): 48-bit ms timestamp + random bits.
+    
+    v7 keys sort by creation time, so primary key inserts append to the
+    right edge of the B-tree instead of landing on random pages. The string
+    is formatted directly rather than via uuid.UUID to keep per-insert CPU low.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    h = '%032x' % (value & _UUID7_CLEAR_MASK | _UUID7_SET_BITS)
+    return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
 
 class Feedback(db.Model):
     __tablename__ = 'feedback'
@@ -16,13 +31,16 @@ class Feedback(db.Model):
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
-    sentiment_analysis = db.relationship('SentimentAnalysis', backref='feedback', uselist=False, lazy='select')
-    ai_response = db.relationship('AIResponse', backref='feedback', uselist=False, lazy='select')
-    audio_file = db.relationship('AudioFile', backref='feedback', uselist=False, lazy='select')
+    # Relations must be eager loaded at the query site (see app.queries)
+    sentiment_analysis = db.relationship('SentimentAnalysis', back_populates='feedback', uselist=False, lazy='raise_on_sql')
+    ai_response = db.relationship('AIResponse', back_populates='feedback', uselist=False, lazy='raise_on_sql')
+    audio_file = db.relationship('AudioFile', back_populates='feedback', uselist=False, lazy='raise_on_sql')
     
     __table_args__ = (
         Index('idx_feedback_created_category', 'created_at', 'category'),
         Index('idx_feedback_status_created', 'processing_status', 'created_at'),
+        # Keyset pagination seeks on (created_at, id), scanned backwards for DESC
+        Index('idx_feedback_created_id', 'created_at', 'id'),
     )
     
     def to_dict(self):
@@ -31,15 +49,17 @@ class Feedback(db.Model):
             'text': self.text,
             'category': self.category,
             'processing_status': self.processing_status,
-            'created_at': self.created_at.replace(tzinfo=timezone.utc).isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.replace(tzinfo=timezone.utc).isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
         }
 
+
 class SentimentAnalysis(db.Model):
     __tablename__ = 'sentiment_analysis'
     
     id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
     feedback_id = db.Column(db.String(36), db.ForeignKey('feedback.id'), nullable=False, unique=True, index=True)
+    feedback = db.relationship('Feedback', back_populates='sentiment_analysis')
     sentiment = db.Column(db.String(20), nullable=False, index=True)
     confidence_score = db.Column(db.Float)
     processed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
@@ -54,14 +74,16 @@ class SentimentAnalysis(db.Model):
             'feedback_id': self.feedback_id,
             'sentiment': self.sentiment,
             'confidence_score': self.confidence_score,
-            'processed_at': self.processed_at.isoformat() if self.processed_at else None,
+            'processed_at': self.processed_at,
         }
 
+
 class AIResponse(db.Model):
     __tablename__ = 'ai_responses'
     
     id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
     feedback_id = db.Column(db.String(36), db.ForeignKey('feedback.id'), nullable=False, unique=True, index=True)
+    feedback = db.relationship('Feedback', back_populates='ai_response')
     response_text = db.Column(db.Text, nullable=False)
     model_used = db.Column(db.String(50), index=True)
     generated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
@@ -72,14 +94,16 @@ class AIResponse(db.Model):
             'feedback_id': self.feedback_id,
             'response_text': self.response_text,
             'model_used': self.model_used,
-            'generated_at': self.generated_at.isoformat() if self.generated_at else None,
+            'generated_at': self.generated_at,
         }
 
+
 class AudioFile(db.Model):
     __tablename__ = 'audio_files'
     
     id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
     feedback_id = db.Column(db.String(36), db.ForeignKey('feedback.id'), nullable=False, unique=True, index=True)
+    feedback = db.relationship('Feedback', back_populates='audio_file')
     file_path = db.Column(db.String(255), nullable=False, unique=True)
     blob_url = db.Column(db.String(500), nullable=True)
     duration_seconds = db.Column(db.Float)
@@ -96,5 +120,18 @@ class AudioFile(db.Model):
             'duration_seconds': self.duration_seconds,
             'file_size': self.file_size,
             'storage_type': self.storage_type,
-            'created_at': self.created_at.replace(tzinfo=timezone.utc).isoformat() if self.created_at else None,
-        }
\ No newline at end of file
+            'created_at': self.created_at,
+        }
+
+
+class FeedbackStatCounter(db.Model):
+    """Running dashboard breakdown counts, bumped in the transaction that changes them.
+    
+    kind 'category': feedback rows per category.
+    kind 'sentiment': completed feedback per sentiment.
+    """
+    __tablename__ = 'feedback_stat_counters'
+    
+    kind = db.Column(db.String(20), primary_key=True)
+    label = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
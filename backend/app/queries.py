@@ -1,26 +1,207 @@
 """Shared query helpers to avoid duplication."""
 
-from sqlalchemy.orm import joinedload
-from app.models import Feedback
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+from flask import g, has_request_context, request
+from sqlalchemy import event, func, select, text, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import selectinload, raiseload
+from app import db
+from app.models import Feedback, SentimentAnalysis, AIResponse, AudioFile, FeedbackStatCounter
+
+logger = logging.getLogger(__name__)
+
+# Loader options are immutable, so one tuple is shared by every query
+_FEEDBACK_RELATION_OPTIONS = (
+    selectinload(Feedback.sentiment_analysis),
+    selectinload(Feedback.ai_response),
+    selectinload(Feedback.audio_file),
+    raiseload('*'),
+)
 
 
 def get_feedback_with_relations(feedback_id: str):
-    """Fetch single feedback with all related entities eagerly loaded."""
-    return (
-        Feedback.query.options(
-            joinedload(Feedback.sentiment_analysis),
-            joinedload(Feedback.ai_response),
-            joinedload(Feedback.audio_file),
-        ).get(feedback_id)
+    """Fetch single feedback with all related entities eagerly loaded.
+    
+    populate_existing reloads relations on instances already in the
+    session (pending changes are autoflushed first), since relations are
+    mapped with lazy='raise_on_sql'.
+    """
+    return db.session.get(
+        Feedback, feedback_id, options=_FEEDBACK_RELATION_OPTIONS, populate_existing=True
     )
 
 
 def base_feedback_query():
-    """Base query with eager loaded relations for listing/filtering."""
-    return Feedback.query.options(
-        joinedload(Feedback.sentiment_analysis),
-        joinedload(Feedback.ai_response),
-        joinedload(Feedback.audio_file),
+    """Base query with eager loaded relations for listing/filtering.
+    
+    `Feedback.text` is intentionally not deferred: list cards, detail views
+    and SSE payloads all render it, and a deferred column is re-fetched with
+    its own SELECT every time an instance is expired by a commit.
+    """
+    return Feedback.query.options(*_FEEDBACK_RELATION_OPTIONS)
+
+
+def feedback_list_query(category: Optional[str] = None):
+    """Flat projection of feedback plus its one-to-one relations for listing.
+    
+    Each relation has at most one row per feedback (unique feedback_id), so
+    the outer joins never multiply rows; one SELECT replaces the primary query
+    plus three selectinload queries, and no ORM instances are built.
+    Rows are shaped by `app.serializers.serialize_feedback_row`.
+    """
+    query = (
+        db.session.query(
+            Feedback.id, Feedback.text, Feedback.category, Feedback.processing_status,
+            Feedback.created_at, Feedback.updated_at,
+            SentimentAnalysis.id.label('sentiment_id'),
+            SentimentAnalysis.sentiment,
+            SentimentAnalysis.confidence_score,
+            SentimentAnalysis.processed_at,
+            AIResponse.id.label('ai_response_id'),
+            AIResponse.response_text,
+            AIResponse.model_used,
+            AIResponse.generated_at,
+            AudioFile.id.label('audio_file_id'),
+            AudioFile.file_path,
+            AudioFile.blob_url,
+            AudioFile.duration_seconds,
+            AudioFile.file_size,
+            AudioFile.storage_type,
+            AudioFile.created_at.label('audio_created_at'),
+        )
+        .outerjoin(SentimentAnalysis, SentimentAnalysis.feedback_id == Feedback.id)
+        .outerjoin(AIResponse, AIResponse.feedback_id == Feedback.id)
+        .outerjoin(AudioFile, AudioFile.feedback_id == Feedback.id)
     )
+    if category:
+        query = query.filter(Feedback.category == category)
+    # id breaks created_at ties so keyset cursors are unambiguous
+    return query.order_by(Feedback.created_at.desc(), Feedback.id.desc())
+
+
+def paginate_with_total(query, page: int, per_page: int) -> Tuple[list, int]:
+    """Fetch one page and the total row count in a single statement.
+    
+    COUNT(*) OVER () is evaluated before LIMIT/OFFSET, so every returned row
+    carries the full total. Only a page past the end, which returns no rows,
+    falls back to a separate COUNT.
+    """
+    rows = (
+        query.add_columns(func.count().over().label('total_count'))
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+        .all()
+    )
+    if rows:
+        return rows, rows[0].total_count
+    if page == 1:
+        return rows, 0
+    return rows, query.order_by(None).count()
+
+
+def keyset_page(query, cursor: Optional[Tuple[datetime, str]], per_page: int) -> Tuple[list, bool]:
+    """Fetch the rows after `cursor` in (created_at, id) descending order.
+    
+    Seeks through idx_feedback_created_id, so cost doesn't grow with depth
+    and no COUNT is needed: one extra row tells whether a next page exists.
+    """
+    if cursor:
+        query = query.filter(tuple_(Feedback.created_at, Feedback.id) < cursor)
+    rows = query.limit(per_page + 1).all()
+    return rows[:per_page], len(rows) > per_page
+
+
+def get_feedbacks_with_relations(feedback_ids: List[str]) -> List[Feedback]:
+    """Fetch several feedback rows with relations in a single round-trip."""
+    if not feedback_ids:
+        return []
+    return db.session.scalars(
+        select(Feedback)
+        .options(*_FEEDBACK_RELATION_OPTIONS)
+        .where(Feedback.id.in_(feedback_ids))
+        .execution_options(populate_existing=True)
+    ).all()
+
+
+def increment_stat_counter(session, kind: str, label: str):
+    """Add one to a dashboard breakdown counter within the caller's transaction.
+    
+    A single INSERT ... ON CONFLICT DO UPDATE, so concurrent writers never
+    race on creating a new label.
+    """
+    insert = postgresql.insert if session.get_bind().dialect.name == 'postgresql' else sqlite.insert
+    session.execute(
+        insert(FeedbackStatCounter)
+        .values(kind=kind, label=label, count=1)
+        .on_conflict_do_update(
+            index_elements=['kind', 'label'],
+            set_={'count': FeedbackStatCounter.count + 1},
+        )
+    )
+
+
+_INSERT_STAT_COUNTS = text(
+    """
+    INSERT INTO feedback_stat_counters (kind, label, count)
+    SELECT 'sentiment', s.sentiment, COUNT(*)
+    FROM sentiment_analysis s
+    JOIN feedback f ON f.id = s.feedback_id
+    WHERE f.processing_status = 'completed'
+    GROUP BY s.sentiment
+    UNION ALL
+    SELECT 'category', COALESCE(category, 'uncategorized'), COUNT(*)
+    FROM feedback
+    GROUP BY category
+    """
+)
+
+
+def backfill_stat_counters():
+    """Fill the breakdown counters from the source tables if none exist yet.
+    
+    Safe at every startup: populated counters are left to the writers that
+    increment them. If another process inserts a counter first, the backfill
+    hits a duplicate key and is rolled back rather than double counting.
+    """
+    if db.session.query(FeedbackStatCounter.kind).first() is not None:
+        return
+    try:
+        db.session.execute(_INSERT_STAT_COUNTS)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        logger.info("Stat counters were populated concurrently; backfill skipped")
+
+
+def rebuild_stat_counters():
+    """Recount the breakdown counters from the source tables.
+    
+    Replaces every counter, so increments committed while it runs can be
+    lost; run it (`flask rebuild-stat-counters`) with writers stopped.
+    """
+    db.session.query(FeedbackStatCounter).delete()
+    db.session.execute(_INSERT_STAT_COUNTS)
+    db.session.commit()
+
 
+def register_query_counter(app, engine, threshold: int):
+    """Warn when a request issues more SQL statements than `threshold`.
+    
+    Feedback reads are expected to cost a fixed handful of statements (row
+    plus one selectinload per relation, or count plus one flat list query);
+    more usually means an N+1 regression.
+    """
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            g.sql_statement_count = g.get('sql_statement_count', 0) + 1
 
+    @app.after_request
+    def _report_statement_count(response):
+        count = g.get('sql_statement_count', 0)
+        if count > threshold:
+            logger.warning('%s %s issued %d SQL statements (threshold %d)', request.method, request.path, count, threshold)
+        return response
@@ -1,34 +1,58 @@
-from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context
+from flask import Blueprint, current_app, request, jsonify, send_file, Response
 from app import db
 from app.models import Feedback, AudioFile
 from app.validators import (
-    FeedbackValidator, QueryValidator, ValidationError,
+    FeedbackValidator, QueryValidator, ValidationError, UUID_RE,
     validate_json_request, handle_database_errors
 )
 from app.background_processor import background_processor
-from app.sse_manager import sse_manager
-from app.queries import base_feedback_query, get_feedback_with_relations
+from app.sse_manager import sse_manager, CONNECTED_FRAME
+from app.queries import (
+    base_feedback_query, get_feedback_with_relations, feedback_list_query,
+    paginate_with_total, keyset_page, increment_stat_counter
+)
 import os
+import hashlib
 import logging
-import json
 import time
-import re
 from datetime import timezone
-import uuid
 from sqlalchemy import text
-from app.serializers import serialize_feedback
+from sqlalchemy.orm import load_only, raiseload
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from app.serializers import serialize_feedback, serialize_feedback_row
+from app.cache import dashboard_cache
+from app.services.speech_service import AUDIO_DIR
+from app.services.blob_storage import get_blob_storage
 
 logger = logging.getLogger(__name__)
 
 api_bp = Blueprint('api', __name__)
 
+# Let browsers keep a copy but revalidate it (cheap 304) on every use
+REVALIDATE_CACHE_CONTROL = 'private, max-age=0, must-revalidate'
+# An audio id always refers to the same bytes
+AUDIO_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+# 'completed' is terminal: no further relations or status changes follow
+COMPLETED_FEEDBACK_CACHE_CONTROL = 'private, max-age=3600, immutable'
+DASHBOARD_STATS_CACHE_KEY = 'dashboard:stats:v2'
+# Resolved once; trailing separator keeps '/tmp' from matching '/tmpfoo'
+AUDIO_ROOT = os.path.realpath(AUDIO_DIR) + os.sep
+
+_DOWNLOAD_VALUES = frozenset({'1', 'true', 'yes', 'on'})
+
+# get_audio reads only these columns; anything else (columns or relations) raises
+_AUDIO_FILE_OPTIONS = (
+    load_only(
+        AudioFile.id, AudioFile.feedback_id, AudioFile.file_path,
+        AudioFile.file_size, AudioFile.created_at,
+        raiseload=True,
+    ),
+    raiseload('*'),
+)
+
 def _is_valid_uuid(uuid_string: str) -> bool:
-    """Validate UUID format robustly using uuid module."""
-    try:
-        uuid.UUID(uuid_string)
-        return True
-    except Exception:
-        return False
+    """Validate UUID format with the precompiled pattern."""
+    return bool(uuid_string) and UUID_RE.fullmatch(uuid_string) is not None
 
 def _error_response(message, code, status=400):
     """Create standardized error response."""
@@ -38,6 +62,58 @@ def _error_response(message, code, status=400):
         'code': code
     }), status
 
+def _if_none_match(etag: str):
+    """Return the If-None-Match validator matching etag, or None.
+
+    Flask-Compress tags compressed bodies as '<etag>:<algorithm>', so clients
+    revalidate with that variant rather than the raw hash.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.contains_weak(etag):
+        return etag
+    for algorithm in current_app.config['COMPRESS_ALGORITHM']:
+        variant = f'{etag}:{algorithm}'
+        if if_none_match.contains_weak(variant):
+            return variant
+    return None
+
+def _single_byte_range():
+    """The request's Range if it is one byte range, else None.
+    
+    Multi-range and unparsable Range headers are ignored and answered with
+    the full 200 body, as RFC 9110 allows.
+    """
+    byte_range = request.range
+    if byte_range is None or byte_range.units != 'bytes' or len(byte_range.ranges) != 1:
+        return None
+    return byte_range
+
+def _not_modified(etag: str, cache_control: str = REVALIDATE_CACHE_CONTROL):
+    """Build a bodiless 304 response for a matching If-None-Match."""
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def _with_validators(response, etag: str, last_modified=None, cache_control: str = REVALIDATE_CACHE_CONTROL):
+    """Attach ETag/Last-Modified so clients can revalidate with a conditional GET."""
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def _feedback_etag(feedback) -> str:
+    """Validator covering the feedback row and which related rows exist."""
+    parts = [
+        feedback.id,
+        feedback.updated_at.isoformat() if feedback.updated_at else '',
+        feedback.processing_status or '',
+    ]
+    for related in (feedback.sentiment_analysis, feedback.ai_response, feedback.audio_file):
+        parts.append(related.id if related else '')
+    return hashlib.blake2b('|'.join(parts).encode(), digest_size=16).hexdigest()
+
 def _get_feedback_with_relations(feedback_id=None):
     """Deprecated: use helpers in app.queries instead."""
     if feedback_id:
@@ -55,18 +131,14 @@ def health_check():
         db.session.execute(text('SELECT 1'))
         db_status = 'healthy'
     except Exception as e:
-        logger.error(f"Database health check failed: {str(e)}")
+        logger.error("Database health check failed: %s", e)
         db_status = 'unhealthy'
     
     try:
-        # Avoid heavy client instantiation; check presence of env/config only
-        services_status = {
-            'text_analytics': {'available': bool(os.environ.get('AZURE_TEXT_ANALYTICS_ENDPOINT') and os.environ.get('AZURE_TEXT_ANALYTICS_KEY')), 'service': 'Azure Text Analytics'},
-            'openai': {'available': bool(os.environ.get('OPENAI_API_KEY')), 'service': 'OpenAI'},
-            'speech': {'available': bool(os.environ.get('AZURE_SPEECH_KEY') and os.environ.get('AZURE_SPEECH_REGION')), 'service': 'Azure Speech'}
-        }
+        # Reuse the processor's already initialized clients rather than building new ones
+        services_status = background_processor.feedback_processor.get_service_status()
     except Exception as e:
-        logger.error(f"Service status check failed: {str(e)}")
+        logger.error("Service status check failed: %s", e)
         services_status = {'error': 'Unable to check service status'}
     
     response_data = {
@@ -94,13 +166,19 @@ def submit_feedback():
         )
         
         db.session.add(feedback)
+        increment_stat_counter(db.session, 'category', feedback.category or 'uncategorized')
         db.session.commit()
         
-        logger.info(f"Feedback {feedback.id} created successfully")
-        
-        sse_manager.send_feedback_update(feedback)
+        logger.info("Feedback %s created successfully", feedback.id)
         
-        background_processor.queue_feedback_processing(feedback.id)
+        # Also emits the initial SSE update with relations eager loaded; a full
+        # queue marks the row failed instead of blocking this request thread
+        if not background_processor.queue_feedback_processing(feedback.id):
+            response, status = _error_response(
+                'Feedback processing is busy. Please try again shortly.', 'QUEUE_FULL', 503
+            )
+            response.headers['Retry-After'] = '5'
+            return response, status
         
         return jsonify({
             'status': 'success',
@@ -118,7 +196,7 @@ def submit_feedback():
         }), 400
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Unexpected error in submit_feedback: {str(e)}")
+        logger.error("Unexpected error in submit_feedback: %s", e)
         return jsonify({
             'status': 'error',
             'message': 'Failed to submit feedback. Please try again.',
@@ -138,15 +216,29 @@ def get_feedback(feedback_id):
         if not feedback:
             return _error_response('Feedback not found', 'NOT_FOUND', 404)
         
+        etag = _feedback_etag(feedback)
+        cache_control = (
+            COMPLETED_FEEDBACK_CACHE_CONTROL if feedback.processing_status == 'completed'
+            else REVALIDATE_CACHE_CONTROL
+        )
+        matched_etag = _if_none_match(etag)
+        if matched_etag:
+            return _not_modified(matched_etag, cache_control)
+        
         response_data = _build_complete_feedback_data(feedback)
         
-        return jsonify({
-            'status': 'success',
-            'data': response_data
-        })
+        return _with_validators(
+            jsonify({
+                'status': 'success',
+                'data': response_data
+            }),
+            etag,
+            feedback.updated_at.replace(tzinfo=timezone.utc) if feedback.updated_at else None,
+            cache_control,
+        )
         
     except Exception as e:
-        logger.error(f"Error retrieving feedback {feedback_id}: {str(e)}")
+        logger.error("Error retrieving feedback %s: %s", feedback_id, e)
         return jsonify({
             'status': 'error',
             'message': 'Failed to retrieve feedback',
@@ -167,42 +259,60 @@ def list_feedback():
             request.args.get('category')
         )
         
-        query = base_feedback_query()
-        
-        if category:
-            query = query.filter(Feedback.category == category)
-        
-        query = query.order_by(Feedback.created_at.desc())
+        # ?cursor= (empty for the first page) selects keyset pagination;
+        # ?page= offset pagination is deprecated but kept for existing clients
+        use_cursor = 'cursor' in request.args
+        try:
+            cursor = QueryValidator.validate_cursor(request.args.get('cursor'))
+        except ValidationError as e:
+            return _error_response(e.message, e.code)
         
         try:
-            feedbacks = query.paginate(
-                page=page, 
-                per_page=per_page, 
-                error_out=False
-            )
+            if use_cursor:
+                rows, has_next = keyset_page(feedback_list_query(category), cursor, per_page)
+                last = rows[-1] if rows else None
+                pagination = {
+                    'per_page': per_page,
+                    'has_next': has_next,
+                    'next_cursor': f'{last.created_at.isoformat()}_{last.id}' if has_next else None
+                }
+            else:
+                rows, total = paginate_with_total(feedback_list_query(category), page, per_page)
+                pages = -(-total // per_page)
+                pagination = {
+                    'page': page,
+                    'pages': pages,
+                    'per_page': per_page,
+                    'total': total,
+                    'has_next': page < pages,
+                    'has_prev': page > 1
+                }
         except Exception as e:
-            logger.error(f"Pagination error: {str(e)}")
+            logger.error("Pagination error: %s", e)
             return jsonify({
                 'status': 'error',
                 'message': 'Invalid pagination parameters',
                 'code': 'PAGINATION_ERROR'
             }), 400
         
-        return jsonify({
-            'status': 'success',
-            'data': [_build_complete_feedback_data(feedback) for feedback in feedbacks.items],
-            'pagination': {
-                'page': page,
-                'pages': feedbacks.pages,
-                'per_page': per_page,
-                'total': feedbacks.total,
-                'has_next': feedbacks.has_next,
-                'has_prev': feedbacks.has_prev
-            },
+        # Stream one encoded item at a time instead of building the full list
+        # of dicts and a single response body
+        dumps = current_app.json.dumps_bytes
+        pagination_tail = dumps({
+            'pagination': pagination,
             'filters': {
                 'category': category
             }
         })
+        def generate():
+            yield b'{"status":"success","data":['
+            for index, row in enumerate(rows):
+                if index:
+                    yield b','
+                yield dumps(serialize_feedback_row(row))
+            yield b'],' + pagination_tail[1:]
+        
+        return Response(generate(), mimetype='application/json')
         
     except Exception as e:
         return jsonify({
@@ -218,41 +328,102 @@ def get_audio(audio_id):
         if not _is_valid_uuid(audio_id):
             return _error_response('Invalid audio ID format', 'INVALID_ID')
 
-        audio_file = AudioFile.query.get(audio_id)
+        audio_file = db.session.get(AudioFile, audio_id, options=_AUDIO_FILE_OPTIONS)
         if not audio_file:
             return _error_response('Audio file not found', 'NOT_FOUND', 404)
 
-        download = request.args.get('download', 'false').lower() == 'true'
+        download = request.args.get('download', '').lower() in _DOWNLOAD_VALUES
         filename = f'feedback_{audio_file.feedback_id}_response.mp3'
+        content_disposition = f'{"attachment" if download else "inline"}; filename="{filename}"'
 
         # Prefer Blob Storage
-        from app.services.blob_storage import get_blob_storage
         blob_service = get_blob_storage()
         if blob_service.is_available:
-            blob_result = blob_service.get_blob_content(audio_file.feedback_id)
-            if blob_result.success and blob_result.data:
-                return Response(
-                    blob_result.data,
-                    mimetype='audio/mpeg',
-                    headers={
-                        'Content-Length': str(len(blob_result.data)),
-                        'Content-Disposition': f'{"attachment" if download else "inline"}; filename="{filename}"'
-                    }
+            # Generated audio is never rewritten, so the audio row identifies the bytes
+            etag = f'{audio_file.id}-{audio_file.file_size or 0}'
+            if request.if_none_match.contains_weak(etag):
+                return _not_modified(etag, AUDIO_CACHE_CONTROL)
+            
+            # Seeking sends Range; serve just that slice when the stored size allows
+            # resolving it (If-Range is answered with the full body)
+            total_size = audio_file.file_size
+            requested_range = _single_byte_range()
+            byte_range = None
+            if total_size and requested_range and 'If-Range' not in request.headers:
+                byte_range = requested_range.range_for_length(total_size)
+                if byte_range is None:
+                    response = Response(status=416)
+                    response.headers['Content-Range'] = f'bytes */{total_size}'
+                    return response
+            
+            offset, length = (byte_range[0], byte_range[1] - byte_range[0]) if byte_range else (None, None)
+            blob_result = blob_service.stream_blob(audio_file.feedback_id, offset, length)
+            if blob_result.success:
+                # Chunks are relayed as they arrive instead of buffering the whole MP3
+                response = _with_validators(
+                    Response(
+                        blob_result.data['chunks'],
+                        status=206 if byte_range else 200,
+                        mimetype='audio/mpeg',
+                        headers={
+                            'Content-Length': str(blob_result.data['size']),
+                            'Accept-Ranges': 'bytes',
+                            'Content-Disposition': content_disposition
+                        }
+                    ),
+                    etag,
+                    audio_file.created_at.replace(tzinfo=timezone.utc) if audio_file.created_at else None,
+                    AUDIO_CACHE_CONTROL,
                 )
+                if byte_range:
+                    response.headers['Content-Range'] = f'bytes {byte_range[0]}-{byte_range[1] - 1}/{total_size}'
+                return response
 
-        # Fallback to local file
-        if os.path.exists(audio_file.file_path):
-            return send_file(
-                audio_file.file_path,
+        # Fallback to local file; send_file hands the open file to wsgi.file_wrapper
+        # (sendfile under gunicorn) or emits X-Sendfile when USE_X_SENDFILE is on
+        file_path = os.path.realpath(audio_file.file_path)
+        if not file_path.startswith(AUDIO_ROOT):
+            logger.error("Audio file %s path is outside the audio directory", audio_id)
+            return _error_response('Audio file not available', 'FILE_NOT_AVAILABLE', 404)
+        accel_prefix = current_app.config['AUDIO_ACCEL_REDIRECT_PREFIX']
+        if accel_prefix:
+            # nginx serves the bytes (with its own Range/conditional handling)
+            # and the worker is free after writing the headers
+            return Response(
+                mimetype='audio/mpeg',
+                headers={
+                    'X-Accel-Redirect': accel_prefix + file_path[len(AUDIO_ROOT):],
+                    'Content-Disposition': content_disposition,
+                    'Cache-Control': AUDIO_CACHE_CONTROL,
+                },
+            )
+        
+        if 'Range' in request.headers and _single_byte_range() is None:
+            # Werkzeug answers these with 416; serve the full body instead
+            request.environ.pop('HTTP_RANGE', None)
+        try:
+            # send_file sets ETag/Last-Modified from the file stat and, being
+            # conditional, answers 304 and Range requests (206) itself; its own
+            # stat doubles as the existence check
+            response = send_file(
+                file_path,
                 as_attachment=download,
                 mimetype='audio/mpeg',
-                download_name=filename if download else None
+                download_name=filename,
+                conditional=True,
             )
+            response.headers['Cache-Control'] = AUDIO_CACHE_CONTROL
+            return response
+        except RequestedRangeNotSatisfiable as e:
+            # Carries Content-Range: bytes */<size>
+            return e.get_response()
+        except FileNotFoundError:
+            pass
 
         return _error_response('Audio file not available - please try again later', 'FILE_NOT_AVAILABLE', 404)
 
     except Exception as e:
-        logger.error(f"Error serving audio file {audio_id}: {str(e)}")
+        logger.error("Error serving audio file %s: %s", audio_id, e)
         return jsonify({
             'status': 'error',
             'message': 'Failed to retrieve audio file',
@@ -262,10 +433,11 @@ def get_audio(audio_id):
 @api_bp.route('/dashboard/stats', methods=['GET'])
 def dashboard_stats():
     try:
-        return jsonify({
-            'status': 'success',
-            'data': _get_dashboard_stats()
-        })
+        body, etag = dashboard_cache.get_or_compute(DASHBOARD_STATS_CACHE_KEY, _dashboard_stats_payload)
+        matched_etag = _if_none_match(etag)
+        if matched_etag:
+            return _not_modified(matched_etag)
+        return _with_validators(Response(body, mimetype='application/json'), etag)
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -273,85 +445,83 @@ def dashboard_stats():
         }), 500
 
 
-def _get_dashboard_stats():
-    """Compose dashboard stats from optimized SQL queries."""
-    total_feedback = db.session.execute(
-        text("SELECT COUNT(*) as count FROM feedback")
-    ).scalar() or 0
-
-    sentiment_results = db.session.execute(
-        text(
-            """
-            SELECT s.sentiment, COUNT(*) as count
-            FROM sentiment_analysis s
-            JOIN feedback f ON f.id = s.feedback_id
-            WHERE f.processing_status = 'completed'
-            GROUP BY s.sentiment
-            """
-        )
-    ).fetchall()
-    sentiment_breakdown = {row.sentiment: row.count for row in sentiment_results}
+def _dashboard_stats_payload():
+    """Encoded stats response and its validator, cached together so hits skip encoding."""
+    body = current_app.json.dumps_bytes({'status': 'success', 'data': _get_dashboard_stats()})
+    return body, hashlib.blake2b(body, digest_size=16).hexdigest()
 
-    category_results = db.session.execute(
-        text(
-            """
-            SELECT COALESCE(category, 'uncategorized') as category, COUNT(*) as count
-            FROM feedback
-            GROUP BY category
-            """
-        )
-    ).fetchall()
-    category_breakdown = {row.category: row.count for row in category_results}
 
-    recent_results = db.session.execute(
+def _get_dashboard_stats():
+    """Compose dashboard stats from optimized SQL queries."""
+    # Counters and the five newest rows in one round-trip; counter rows leave
+    # the feedback columns NULL. Breakdowns come from counters maintained on
+    # write, and every feedback row has exactly one category, so those counts
+    # sum to the total
+    results = db.session.execute(
         text(
             """
-            SELECT 
-                f.id, f.text, f.category, f.created_at, f.processing_status,
-                s.sentiment, s.confidence_score,
-                a.response_text,
-                af.id as audio_file_id
-            FROM feedback f
-            LEFT JOIN sentiment_analysis s ON f.id = s.feedback_id
-            LEFT JOIN ai_responses a ON f.id = a.feedback_id
-            LEFT JOIN audio_files af ON f.id = af.feedback_id
-            ORDER BY f.created_at DESC
-            LIMIT 5
+            SELECT kind, label, count,
+                NULL as id, NULL as text, NULL as category, NULL as created_at,
+                NULL as processing_status, NULL as sentiment, NULL as confidence_score,
+                NULL as response_text, NULL as audio_file_id
+            FROM feedback_stat_counters
+            UNION ALL
+            SELECT 'recent', NULL, NULL, recent.*
+            FROM (
+                SELECT 
+                    f.id, f.text, f.category, f.created_at, f.processing_status,
+                    s.sentiment, s.confidence_score,
+                    a.response_text,
+                    af.id as audio_file_id
+                FROM feedback f
+                LEFT JOIN sentiment_analysis s ON f.id = s.feedback_id
+                LEFT JOIN ai_responses a ON f.id = a.feedback_id
+                LEFT JOIN audio_files af ON f.id = af.feedback_id
+                ORDER BY f.created_at DESC
+                LIMIT 5
+            ) recent
             """
         )
     ).fetchall()
+    sentiment_breakdown = {}
+    category_breakdown = {}
+    recent_results = []
+    for row in results:
+        if row.kind == 'recent':
+            recent_results.append(row)
+        else:
+            target = sentiment_breakdown if row.kind == 'sentiment' else category_breakdown
+            target[row.label] = row.count
+    total_feedback = sum(category_breakdown.values())
+    # UNION ALL doesn't promise to keep the subquery's order
+    recent_results.sort(key=lambda row: row.created_at, reverse=True)
 
+    # Postgres yields datetimes, which the orjson provider encodes (naive as
+    # UTC); SQLite yields the stored ISO string, which passes through as-is
     recent_feedback_data = []
-    for row in recent_results:
-        created_at_iso = None
-        if row.created_at:
-            created_at_iso = (
-                row.created_at.replace(tzinfo=timezone.utc).isoformat()
-                if hasattr(row.created_at, 'isoformat')
-                else str(row.created_at)
-            )
-
+    for m in (row._mapping for row in recent_results):
+        audio_file_id = m['audio_file_id']
         recent_feedback_data.append(
             {
-                'id': row.id,
-                'text': row.text,
-                'category': row.category,
-                'created_at': created_at_iso,
-                'processing_status': row.processing_status,
+                'id': m['id'],
+                'text': m['text'],
+                'category': m['category'],
+                'created_at': m['created_at'],
+                'processing_status': m['processing_status'],
                 'sentiment_analysis': (
                     {
-                        'sentiment': row.sentiment,
-                        'confidence_score': row.confidence_score,
+                        'sentiment': m['sentiment'],
+                        'confidence_score': m['confidence_score'],
                     }
-                    if row.sentiment
+                    if m['sentiment']
                     else None
                 ),
                 'ai_response': (
-                    {'response_text': row.response_text} if row.response_text else None
+                    {'response_text': m['response_text']} if m['response_text'] else None
                 ),
-                'audio_file': ({'id': row.audio_file_id} if row.audio_file_id else None),
+                'audio_file': ({'id': audio_file_id} if audio_file_id else None),
                 'audio_url': (
-                    f'/api/v1/audio/{row.audio_file_id}' if row.audio_file_id else None
+                    f'/api/v1/audio/{audio_file_id}' if audio_file_id else None
                 ),
             }
         )
@@ -370,20 +540,24 @@ def sse_stream():
     
     def event_generator():
         try:
-            yield f"data: {json.dumps({'type': 'connected', 'message': 'SSE connection established'})}\n\n"
+            yield CONNECTED_FRAME
             for event in client.get_events():
                 yield event
         except Exception as e:
-            logger.error(f"SSE stream error: {str(e)}")
+            logger.error("SSE stream error: %s", e)
             client.disconnect()
     
+    # No stream_with_context: the generator never touches the request, so the
+    # request context and its DB session are torn down as soon as streaming starts
     return Response(
-        stream_with_context(event_generator()),
+        event_generator(),
         mimetype='text/event-stream',
         headers={
             'Cache-Control': 'no-cache, no-transform',
             'Connection': 'keep-alive',
             'X-Accel-Buffering': 'no',
             'Content-Type': 'text/event-stream; charset=utf-8',
-        }
+        },
+        # Frames are already bytes; skip Werkzeug's per-chunk encoding pass
+        direct_passthrough=True,
     )
\ No newline at end of file
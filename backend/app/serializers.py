@@ -1,4 +1,7 @@
-"""Serialization helpers for API and SSE payloads."""
+"""Serialization helpers for API and SSE payloads.
+
+Timestamps stay datetimes; orjson formats them natively (naive values as UTC).
+"""
 
 from typing import Dict, Any
 from app.models import Feedback
@@ -8,16 +11,64 @@ def serialize_feedback(feedback: Feedback) -> Dict[str, Any]:
     """Serialize a `Feedback` model including related entities."""
     data: Dict[str, Any] = feedback.to_dict()
 
-    if getattr(feedback, "sentiment_analysis", None):
-        data["sentiment_analysis"] = feedback.sentiment_analysis.to_dict()
+    # Relations exist before 'completed' (SSE milestones show them), so every
+    # item is checked; each relation attribute is read once
+    sentiment_analysis = feedback.sentiment_analysis
+    if sentiment_analysis:
+        data["sentiment_analysis"] = sentiment_analysis.to_dict()
 
-    if getattr(feedback, "ai_response", None):
-        data["ai_response"] = feedback.ai_response.to_dict()
+    ai_response = feedback.ai_response
+    if ai_response:
+        data["ai_response"] = ai_response.to_dict()
 
-    if getattr(feedback, "audio_file", None):
-        data["audio_file"] = feedback.audio_file.to_dict()
-        data["audio_url"] = f"/api/v1/audio/{feedback.audio_file.id}"
+    audio_file = feedback.audio_file
+    if audio_file:
+        data["audio_file"] = audio_file.to_dict()
+        data["audio_url"] = f"/api/v1/audio/{audio_file.id}"
 
     return data
 
 
+def serialize_feedback_row(row) -> Dict[str, Any]:
+    """Serialize a `feedback_list_query` row; same shape as `serialize_feedback`."""
+    data: Dict[str, Any] = {
+        "id": row.id,
+        "text": row.text,
+        "category": row.category,
+        "processing_status": row.processing_status,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+    if row.sentiment_id:
+        data["sentiment_analysis"] = {
+            "id": row.sentiment_id,
+            "feedback_id": row.id,
+            "sentiment": row.sentiment,
+            "confidence_score": row.confidence_score,
+            "processed_at": row.processed_at,
+        }
+
+    if row.ai_response_id:
+        data["ai_response"] = {
+            "id": row.ai_response_id,
+            "feedback_id": row.id,
+            "response_text": row.response_text,
+            "model_used": row.model_used,
+            "generated_at": row.generated_at,
+        }
+
+    if row.audio_file_id:
+        data["audio_file"] = {
+            "id": row.audio_file_id,
+            "feedback_id": row.id,
+            "file_path": row.file_path,
+            "blob_url": row.blob_url,
+            "duration_seconds": row.duration_seconds,
+            "file_size": row.file_size,
+            "storage_type": row.storage_type,
+            "created_at": row.audio_created_at,
+        }
+        data["audio_url"] = f"/api/v1/audio/{row.audio_file_id}"
+
+    return data
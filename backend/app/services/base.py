@@ -1,10 +1,14 @@
 """Base service classes."""
 
 import logging
+import random
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple, Type
 from functools import wraps
 import time
+import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -31,17 +35,31 @@ class BaseExternalService(ABC):
         try:
             if self._validate_credentials() and self._initialize_client():
                 self.is_available = True
-                logger.info(f"{self.service_name} service initialized successfully")
+                logger.info("%s service initialized successfully", self.service_name)
             else:
                 self.is_available = False
-                logger.warning(f"{self.service_name} service not available - using fallback")
+                logger.warning("%s service not available - using fallback", self.service_name)
         except Exception as e:
-            logger.error(f"Failed to initialize {self.service_name} service: {str(e)}")
+            logger.error("Failed to initialize %s service: %s", self.service_name, e)
             self.is_available = False
 
 
-def retry_on_failure(max_retries: int = 2, delay: float = 1.0):
-    """Decorator to retry operations on failure with exponential backoff."""
+class TransientServiceError(Exception):
+    """An external API failure worth retrying (rate limited or server-side)."""
+
+
+# Failures of an HTTP call that may succeed on retry; 4xx and auth errors are not
+TRANSIENT_HTTP_ERRORS = (requests.ConnectionError, requests.Timeout, TransientServiceError)
+
+
+def retry_on_failure(max_retries: int = 2, delay: float = 1.0, max_delay: float = 30.0,
+                     retry_on: Tuple[Type[BaseException], ...] = (Exception,)):
+    """Decorator to retry operations on failure with capped, jittered exponential backoff.
+    
+    The random extra wait (up to half the backoff) keeps workers that failed
+    together from retrying against the same API in lockstep. Exceptions not
+    matching `retry_on` are raised immediately.
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -50,14 +68,14 @@ def retry_on_failure(max_retries: int = 2, delay: float = 1.0):
             for attempt in range(max_retries + 1):
                 try:
                     return func(*args, **kwargs)
-                except Exception as e:
+                except retry_on as e:
                     last_exception = e
                     if attempt < max_retries:
-                        wait_time = delay * (2 ** attempt)  # Exponential backoff
-                        logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {str(e)}. Retrying in {wait_time}s...")
+                        wait_time = min(max_delay, delay * (2 ** attempt)) * (1 + random.uniform(0, 0.5))
+                        logger.warning("Attempt %s failed for %s: %s. Retrying in %.2fs...", attempt + 1, func.__name__, e, wait_time)
                         time.sleep(wait_time)
                     else:
-                        logger.error(f"All {max_retries + 1} attempts failed for {func.__name__}")
+                        logger.error("All %s attempts failed for %s", max_retries + 1, func.__name__)
             
             raise last_exception
         return wrapper
@@ -81,4 +99,45 @@ class ServiceResponse:
             'error': self.error,
             'service_used': self.service_used,
             'timestamp': self.timestamp
-        }
\ No newline at end of file
+        }
+
+
+# Keep-alive connections kept per host. Blob uploads alone can open
+# BG_WORKERS x UPLOAD_MAX_CONCURRENCY at once; connections beyond this are
+# closed after use instead of being reused
+HTTP_POOL_MAXSIZE = 64
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide pooled HTTP session shared by the external services.
+    
+    Keeps TCP/TLS connections alive across pipeline stages and worker
+    threads instead of opening a new connection per API call.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_MAXSIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _http_session = session
+    return _http_session
+
+
+def reset_http_session() -> None:
+    """Drop pooled connections inherited across fork().
+    
+    The session is created lazily, so under gunicorn's preload_app the
+    master opens it (and keep-alive sockets) before forking. Service
+    clients built before the fork hold the session itself, so it is kept
+    and only its connection pools are emptied; each worker then opens its own.
+    """
+    with _http_session_lock:
+        if _http_session is not None:
+            for adapter in set(_http_session.adapters.values()):
+                adapter.poolmanager.clear()
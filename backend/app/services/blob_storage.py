@@ -2,13 +2,24 @@
 
 import os
 import logging
-from typing import Optional
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from azure.core.pipeline.transport import RequestsTransport
 from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions, ContentSettings
-from datetime import datetime, timedelta
-from .base import BaseExternalService, ServiceResponse
+from datetime import datetime, timedelta, timezone
+from .base import BaseExternalService, ServiceResponse, get_http_session
 
 logger = logging.getLogger(__name__)
 
+# Parallel block PUTs for blobs above the SDK's single-shot upload threshold
+UPLOAD_MAX_CONCURRENCY = 8
+# Cached SAS URLs are re-signed once they are this close to expiring
+SAS_REFRESH_MARGIN_SECONDS = 300
+# Expired entries are swept when the SAS cache grows past this
+SAS_CACHE_MAX_ENTRIES = 1024
+
 
 class BlobStorageService(BaseExternalService):
     
@@ -16,6 +27,14 @@ class BlobStorageService(BaseExternalService):
         super().__init__("Azure Blob Storage")
         self.connection_string = os.environ.get('AZURE_STORAGE_CONNECTION_STRING')
         self.container_name = "audio-files"
+        # Blob clients share the service client's pipeline; keep recent ones
+        # instead of building a new client per call
+        self._get_blob_client = lru_cache(maxsize=256)(self._new_blob_client)
+        # (blob_name, hours_valid) -> (sas_url, refresh_after)
+        self._sas_cache: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self._account_name: Optional[str] = None
+        self._account_key: Optional[str] = None
+        self._blob_url_prefix = ""
         self.initialize()
     
     def _validate_credentials(self) -> bool:
@@ -26,19 +45,35 @@ class BlobStorageService(BaseExternalService):
         """Initialize Azure Blob Storage client."""
         try:
             self.blob_service_client = BlobServiceClient.from_connection_string(
-                self.connection_string
+                self.connection_string,
+                transport=RequestsTransport(session=get_http_session(), session_owner=False)
+            )
+            # Account credentials for SAS signing, parsed once
+            conn_parts = dict(
+                item.split('=', 1) for item in self.connection_string.split(';') if '=' in item
+            )
+            self._account_name = conn_parts.get('AccountName')
+            self._account_key = conn_parts.get('AccountKey')
+            self._blob_url_prefix = (
+                f"https://{self._account_name}.blob.core.windows.net/{self.container_name}/"
             )
             container_client = self.blob_service_client.get_container_client(self.container_name)
             try:
                 container_client.get_container_properties()
             except Exception:
                 container_client.create_container()
-                logger.info(f"Created blob container: {self.container_name}")
+                logger.info("Created blob container: %s", self.container_name)
             return True
         except Exception as e:
-            logger.error(f"Failed to initialize Blob Storage client: {str(e)}")
+            logger.error("Failed to initialize Blob Storage client: %s", e)
             return False
     
+    def _new_blob_client(self, blob_name: str):
+        return self.blob_service_client.get_blob_client(
+            container=self.container_name,
+            blob=blob_name
+        )
+    
     def upload_audio_file(self, local_file_path: str, feedback_id: str) -> ServiceResponse:
         """
         Upload audio file to Blob Storage.
@@ -59,24 +94,22 @@ class BlobStorageService(BaseExternalService):
         
         try:
             blob_name = f"{feedback_id}.mp3"
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=blob_name
-            )
+            blob_client = self._get_blob_client(blob_name)
             
+            # A known length lets the SDK stream and chunk the file without buffering it
+            file_size = os.path.getsize(local_file_path)
             with open(local_file_path, "rb") as data:
                 blob_client.upload_blob(
                     data, 
                     overwrite=True,
+                    length=file_size,
+                    max_concurrency=UPLOAD_MAX_CONCURRENCY,
                     content_settings=ContentSettings(content_type="audio/mpeg")
                 )
             
-            blob_properties = blob_client.get_blob_properties()
-            file_size = blob_properties.size
-            
             sas_url = self.generate_sas_url(blob_name, hours_valid=24)
             
-            logger.info(f"Audio file uploaded to blob: {blob_name} ({file_size} bytes)")
+            logger.info("Audio file uploaded to blob: %s (%s bytes)", blob_name, file_size)
             
             return ServiceResponse(
                 success=True,
@@ -91,7 +124,7 @@ class BlobStorageService(BaseExternalService):
             )
             
         except Exception as e:
-            logger.error(f"Failed to upload audio file to blob storage: {str(e)}")
+            logger.error("Failed to upload audio file to blob storage: %s", e)
             return ServiceResponse(
                 success=False,
                 error=str(e),
@@ -109,15 +142,15 @@ class BlobStorageService(BaseExternalService):
         Returns:
             SAS URL string
         """
+        cache_key = (blob_name, hours_valid)
+        cached = self._sas_cache.get(cache_key)
+        now = time.time()
+        if cached and now < cached[1]:
+            return cached[0]
+        
         try:
-            conn_parts = {}
-            for item in self.connection_string.split(';'):
-                if '=' in item:
-                    key, value = item.split('=', 1)
-                    conn_parts[key] = value
-            
-            account_name = conn_parts.get('AccountName')
-            account_key = conn_parts.get('AccountKey')
+            account_name = self._account_name
+            account_key = self._account_key
             
             if not account_name or not account_key:
                 logger.error("Unable to extract account name/key from connection string")
@@ -129,25 +162,38 @@ class BlobStorageService(BaseExternalService):
                 blob_name=blob_name,
                 account_key=account_key,
                 permission=BlobSasPermissions(read=True),
-                expiry=datetime.utcnow() + timedelta(hours=hours_valid)
+                expiry=datetime.now(timezone.utc) + timedelta(hours=hours_valid)
             )
             
-            blob_url = f"https://{account_name}.blob.core.windows.net/{self.container_name}/{blob_name}"
-            return f"{blob_url}?{sas_token}"
+            sas_url = f"{self._blob_url_prefix}{blob_name}?{sas_token}"
+            self._cache_sas_url(cache_key, sas_url, now + hours_valid * 3600 - SAS_REFRESH_MARGIN_SECONDS)
+            return sas_url
             
         except Exception as e:
-            logger.error(f"Failed to generate SAS URL: {str(e)}")
+            logger.error("Failed to generate SAS URL: %s", e)
             return ""
     
-    def get_blob_content(self, feedback_id: str) -> ServiceResponse:
+    def _cache_sas_url(self, key: Tuple[str, int], sas_url: str, refresh_after: float):
+        if len(self._sas_cache) >= SAS_CACHE_MAX_ENTRIES:
+            now = time.time()
+            # Copy first; other threads may insert while this one sweeps
+            for stale in [k for k, v in list(self._sas_cache.items()) if v[1] <= now]:
+                self._sas_cache.pop(stale, None)
+            if len(self._sas_cache) >= SAS_CACHE_MAX_ENTRIES:
+                self._sas_cache.clear()
+        self._sas_cache[key] = (sas_url, refresh_after)
+    
+    def stream_blob(self, feedback_id: str, offset: Optional[int] = None, length: Optional[int] = None) -> ServiceResponse:
         """
-        Get blob content as bytes for streaming.
+        Open a chunked download of a blob, optionally limited to a byte range.
         
         Args:
             feedback_id: Unique identifier for the feedback
+            offset: First byte to download
+            length: Number of bytes to download from offset
             
         Returns:
-            ServiceResponse with blob content in data field
+            ServiceResponse with 'chunks' (iterator of bytes) and 'size' in data field
         """
         if not self.is_available:
             return ServiceResponse(
@@ -158,21 +204,19 @@ class BlobStorageService(BaseExternalService):
         
         try:
             blob_name = f"{feedback_id}.mp3"
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=blob_name
-            )
+            blob_client = self._get_blob_client(blob_name)
             
-            blob_data = blob_client.download_blob().readall()
+            # The first request is issued here, so a missing blob fails before streaming starts
+            downloader = blob_client.download_blob(offset=offset, length=length)
             
             return ServiceResponse(
                 success=True,
-                data=blob_data,
+                data={'chunks': downloader.chunks(), 'size': downloader.size},
                 service_used="blob_storage"
             )
             
         except Exception as e:
-            logger.error(f"Failed to get blob content for {feedback_id}: {str(e)}")
+            logger.error("Failed to open blob stream for %s: %s", feedback_id, e)
             return ServiceResponse(
                 success=False,
                 error=f"Failed to retrieve blob content: {str(e)}",
@@ -198,13 +242,10 @@ class BlobStorageService(BaseExternalService):
         
         try:
             blob_name = f"{feedback_id}.mp3"
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=blob_name
-            )
+            blob_client = self._get_blob_client(blob_name)
             
             blob_client.delete_blob()
-            logger.info(f"Audio file deleted from blob: {blob_name}")
+            logger.info("Audio file deleted from blob: %s", blob_name)
             
             return ServiceResponse(
                 success=True,
@@ -213,7 +254,7 @@ class BlobStorageService(BaseExternalService):
             )
             
         except Exception as e:
-            logger.error(f"Failed to delete audio file from blob storage: {str(e)}")
+            logger.error("Failed to delete audio file from blob storage: %s", e)
             return ServiceResponse(
                 success=False,
                 error=str(e),
@@ -242,16 +283,23 @@ class BlobStorageService(BaseExternalService):
             return sas_url
             
         except Exception as e:
-            logger.error(f"Failed to get audio URL: {str(e)}")
+            logger.error("Failed to get audio URL: %s", e)
             return None
 
 
 _blob_singleton: Optional[BlobStorageService] = None
+_blob_singleton_lock = threading.Lock()
 
 
 def get_blob_storage() -> BlobStorageService:
-    """Process-wide singleton accessor for BlobStorageService."""
+    """Process-wide singleton accessor for BlobStorageService.
+    
+    Availability is probed once when the client is built; later calls are a
+    global read.
+    """
     global _blob_singleton
     if _blob_singleton is None:
-        _blob_singleton = BlobStorageService()
+        with _blob_singleton_lock:
+            if _blob_singleton is None:
+                _blob_singleton = BlobStorageService()
     return _blob_singleton
\ No newline at end of file
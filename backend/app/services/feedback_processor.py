@@ -1,15 +1,22 @@
 """Main feedback processor."""
 
+import os
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional
+from sqlalchemy.orm import load_only
 from app import db
 from app.models import Feedback, SentimentAnalysis, AIResponse, AudioFile
+from app.queries import get_feedback_with_relations, increment_stat_counter
 from .text_analytics import AzureTextAnalyticsService
 from .openai_service import OpenAIResponseService
 from .speech_service import AzureSpeechService
 
 logger = logging.getLogger(__name__)
 
+# Audio generation started ahead of the analysis commit; one per pipeline in flight
+STAGE_WORKERS = int(os.environ.get('BG_WORKERS', '4'))
+
 
 class FeedbackProcessor:
     
@@ -17,123 +24,105 @@ class FeedbackProcessor:
         self.text_analytics = AzureTextAnalyticsService()
         self.openai_service = OpenAIResponseService()
         self.speech_service = AzureSpeechService()
+        self._executor = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="feedback-stage")
     
     def process_feedback_complete(self, feedback_id: str) -> bool:
         """Process feedback through the complete pipeline.
-        Emits SSE updates after key milestones via sse_manager.
+        Emits SSE updates after key milestones via sse_manager and marks
+        the feedback 'completed' in the same commit as the audio metadata.
         """
         try:
-            # Get feedback from database
-            feedback = Feedback.query.get(feedback_id)
+            # Get feedback from database; the pipeline only reads the text
+            feedback = db.session.get(
+                Feedback, feedback_id, options=[load_only(Feedback.id, Feedback.text)]
+            )
             if not feedback:
-                logger.error(f"Feedback {feedback_id} not found")
+                logger.error("Feedback %s not found", feedback_id)
                 return False
             
             # Step 1: Sentiment Analysis
-            sentiment_result = self._process_sentiment_analysis(feedback)
-            if not sentiment_result:
-                logger.error(f"Sentiment analysis failed for feedback {feedback_id}")
+            sentiment_result = self.text_analytics.analyze_sentiment_with_opinions(feedback.text)
+            if not (sentiment_result.success and sentiment_result.data):
+                logger.error("Sentiment analysis failed for feedback %s: %s", feedback_id, sentiment_result.error)
                 return False
-            # Emit update after sentiment commit
-            try:
-                from app.sse_manager import sse_manager
-                sse_manager.send_feedback_update(feedback)
-            except Exception:
-                logger.debug("SSE update after sentiment skipped")
             
             # Step 2: AI Response Generation
-            response_result = self._process_ai_response(feedback, sentiment_result.data)
-            if not response_result:
-                logger.error(f"AI response generation failed for feedback {feedback_id}")
+            response_result = self.openai_service.generate_contextual_response(
+                feedback.text, sentiment_result.data
+            )
+            if not (response_result.success and response_result.data):
+                logger.error("AI response generation failed for feedback %s: %s", feedback_id, response_result.error)
                 return False
-            # Emit update after AI response commit
+            # Audio only needs the response text; it is generated while the
+            # analysis is saved and broadcast
+            audio_future = self._executor.submit(
+                self.speech_service.generate_emotion_aware_audio,
+                response_result.data['response_text'], sentiment_result.data, feedback.id
+            )
+            # Both rows go in one commit; no transaction is held open across
+            # an external call
+            self._process_sentiment_analysis(feedback, sentiment_result)
+            self._process_ai_response(feedback, response_result)
+            db.session.commit()
+            # Emit update after the analysis commit
             try:
                 from app.sse_manager import sse_manager
-                sse_manager.send_feedback_update(feedback)
+                sse_manager.send_feedback_update(get_feedback_with_relations(feedback_id))
             except Exception:
-                logger.debug("SSE update after ai_response skipped")
+                logger.debug("SSE update after analysis skipped")
             
-            # Step 3: Audio Generation (optional)
-            self._process_audio_generation(feedback, sentiment_result.data, response_result.data)
+            # Step 3: Audio Generation (optional), committed together with the final status
+            self._process_audio_generation(feedback, audio_future, response_result.data)
+            feedback.processing_status = 'completed'
+            increment_stat_counter(db.session, 'sentiment', sentiment_result.data['sentiment'])
             try:
                 from app.sse_manager import sse_manager
-                sse_manager.send_feedback_update(feedback)
+                sse_manager.queue_feedback_update(db.session, get_feedback_with_relations(feedback_id))
             except Exception:
                 logger.debug("SSE update after audio skipped")
+            db.session.commit()
             
-            logger.info(f"Processing completed for feedback {feedback_id}")
+            logger.info("Processing completed for feedback %s", feedback_id)
             return True
             
         except Exception as e:
-            logger.error(f"Error processing feedback {feedback_id}: {str(e)}")
+            logger.error("Error processing feedback %s: %s", feedback_id, e)
             db.session.rollback()
             return False
     
-    def _process_sentiment_analysis(self, feedback: Feedback) -> Optional[object]:
-        """Process sentiment analysis and save to database."""
-        try:
-            sentiment_result = self.text_analytics.analyze_sentiment_with_opinions(feedback.text)
-            
-            if sentiment_result.success and sentiment_result.data:
-                # Store enhanced sentiment analysis
-                sentiment_analysis = SentimentAnalysis(
-                    feedback_id=feedback.id,
-                    sentiment=sentiment_result.data['sentiment'],
-                    confidence_score=sentiment_result.data['confidence_score']
-                )
-                db.session.add(sentiment_analysis)
-                db.session.commit()
-                
-                logger.info(f"Sentiment analysis saved: {sentiment_result.data['sentiment']} "
-                           f"(confidence: {sentiment_result.data['confidence_score']:.2f}, "
-                           f"service: {sentiment_result.service_used})")
-                
-                return sentiment_result
-            else:
-                logger.error(f"Sentiment analysis failed: {sentiment_result.error}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error in sentiment analysis: {str(e)}")
-            db.session.rollback()
-            return None
+    def _process_sentiment_analysis(self, feedback: Feedback, sentiment_result) -> None:
+        """Stage a successful sentiment analysis result in the session."""
+        # Store enhanced sentiment analysis
+        sentiment_analysis = SentimentAnalysis(
+            feedback_id=feedback.id,
+            sentiment=sentiment_result.data['sentiment'],
+            confidence_score=sentiment_result.data['confidence_score']
+        )
+        db.session.add(sentiment_analysis)
+        
+        logger.info("Sentiment analysis saved: %s (confidence: %.2f, service: %s)",
+                    sentiment_result.data['sentiment'], sentiment_result.data['confidence_score'],
+                    sentiment_result.service_used)
     
-    def _process_ai_response(self, feedback: Feedback, sentiment_data: dict) -> Optional[object]:
-        """Process AI response generation and save to database."""
-        try:
-            response_result = self.openai_service.generate_contextual_response(
-                feedback.text, sentiment_data
-            )
-            
-            if response_result.success and response_result.data:
-                # Store AI response
-                ai_response = AIResponse(
-                    feedback_id=feedback.id,
-                    response_text=response_result.data['response_text'],
-                    model_used=response_result.data['model_used']
-                )
-                db.session.add(ai_response)
-                db.session.commit()
-                
-                logger.info(f"AI response generated using {response_result.data['model_used']} "
-                           f"(service: {response_result.service_used})")
-                
-                return response_result
-            else:
-                logger.error(f"AI response generation failed: {response_result.error}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error in AI response generation: {str(e)}")
-            db.session.rollback()
-            return None
+    def _process_ai_response(self, feedback: Feedback, response_result) -> None:
+        """Stage a successful AI response in the session."""
+        # Store AI response
+        ai_response = AIResponse(
+            feedback_id=feedback.id,
+            response_text=response_result.data['response_text'],
+            model_used=response_result.data['model_used']
+        )
+        db.session.add(ai_response)
+        
+        logger.info("AI response generated using %s (service: %s)",
+                    response_result.data['model_used'], response_result.service_used)
     
-    def _process_audio_generation(self, feedback: Feedback, sentiment_data: dict, response_data: dict) -> Optional[object]:
-        """Process audio generation and save to database (optional step)."""
+    def _process_audio_generation(self, feedback: Feedback, audio_future: Future, response_data: dict) -> Optional[object]:
+        """Wait for audio generation and stage it in the session (optional step).
+        The caller commits it together with the final processing status.
+        """
         try:
-            audio_result = self.speech_service.generate_emotion_aware_audio(
-                response_data['response_text'], sentiment_data, feedback.id
-            )
+            audio_result = audio_future.result()
             
             if audio_result.success and audio_result.data:
                 # Store audio file metadata with blob information
@@ -149,18 +138,17 @@ class FeedbackProcessor:
                     duration_seconds=self.speech_service.estimate_duration(response_data['response_text'])
                 )
                 db.session.add(audio_file)
-                db.session.commit()
                 
-                logger.info(f"Emotion-aware audio generated: {audio_result.data['voice_used']} "
-                           f"with {audio_result.data['emotion_style']} style")
+                logger.info("Emotion-aware audio generated: %s with %s style",
+                            audio_result.data['voice_used'], audio_result.data['emotion_style'])
                 
                 return audio_result
             else:
-                logger.warning(f"Audio generation failed: {audio_result.error if audio_result else 'Unknown error'}")
+                logger.warning("Audio generation failed: %s", audio_result.error if audio_result else 'Unknown error')
                 return None
                 
         except Exception as e:
-            logger.warning(f"Error in audio generation (non-critical): {str(e)}")
+            logger.warning("Error in audio generation (non-critical): %s", e)
             # Audio generation is optional - don't rollback the transaction
             return None
     
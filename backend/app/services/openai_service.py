@@ -1,13 +1,65 @@
 """OpenAI service for generating contextual responses (HTTP API)."""
 
 import os
+import re
+import hashlib
 import logging
+from types import MappingProxyType
 from typing import Dict, Any
-import requests
-from .base import BaseExternalService, retry_on_failure, ServiceResponse
+from app.cache import LRUCache
+from .base import (
+    BaseExternalService, retry_on_failure, ServiceResponse, get_http_session,
+    TransientServiceError, TRANSIENT_HTTP_ERRORS,
+)
 
 logger = logging.getLogger(__name__)
 
+# Completions are reused for repeated feedback with the same sentiment;
+# duplicate and template-driven submissions are common
+RESPONSE_CACHE_SIZE = 1024
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _normalize_feedback(text: str) -> str:
+    """Feedback text with case, punctuation and spacing folded away.
+    
+    "Great service!" and "great  service" ask for the same reply; anything
+    that differs in its words does not match.
+    """
+    return ' '.join(_WORD_RE.findall(text.casefold())) or text
+
+# Identical on every request; kept first so it forms a stable prompt prefix
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an expert customer service representative known for empathetic, personalized responses.",
+}
+
+_PROMPT_TEMPLATE = """
+        Generate a professional, empathetic customer service response to this feedback.
+        
+        Customer Feedback: "{feedback_text}"
+        
+        Analysis Context:
+        {context}
+        
+        Response Requirements:
+        1. Be genuine and empathetic
+        2. Address the specific sentiment and key points mentioned
+        3. Use appropriate tone for the sentiment level
+        4. Keep response concise but meaningful (2-3 sentences)
+        5. If specific aspects were mentioned, acknowledge them
+        6. Provide appropriate next steps or appreciation
+        
+        Generate only the response text, no additional formatting.
+        """
+
+_FALLBACK_RESPONSES = MappingProxyType({
+    'positive': "Thank you so much for your wonderful feedback! We're thrilled to hear about your positive experience and truly appreciate you taking the time to share it with us.",
+    'negative': "We sincerely appreciate you bringing this to our attention and apologize for any inconvenience you've experienced. Your feedback is invaluable in helping us improve our service.",
+    'neutral': "Thank you for your feedback. We appreciate you taking the time to share your thoughts with us, and we'll use this information to continue improving our service."
+})
+
 
 class OpenAIResponseService(BaseExternalService):
     
@@ -17,6 +69,14 @@ class OpenAIResponseService(BaseExternalService):
         self.model = os.environ.get('OPENAI_MODEL', 'gpt-4o')
         self.base_url = os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com')
         self.timeout_seconds = 30
+        self.http = get_http_session()
+        self._response_cache = LRUCache(RESPONSE_CACHE_SIZE)
+        # Request constants, built once
+        self._completions_url = f"{self.base_url.rstrip('/')}/v1/chat/completions"
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
         self.initialize()
     
     def _validate_credentials(self) -> bool:
@@ -27,7 +87,6 @@ class OpenAIResponseService(BaseExternalService):
         """Validate OpenAI API credentials."""
         return bool(self.base_url and self.api_key)
     
-    @retry_on_failure(max_retries=2, delay=1.0)
     def generate_contextual_response(self, feedback_text: str, sentiment_data: Dict[str, Any]) -> ServiceResponse:
         """Generate contextual response using OpenAI Chat Completions API."""
         if not self.is_available:
@@ -39,30 +98,17 @@ class OpenAIResponseService(BaseExternalService):
             key_phrases = sentiment_data.get('key_phrases', [])
             opinions = sentiment_data.get('opinions', [])
             
+            cache_key = hashlib.blake2b(
+                f"{self.model}|{sentiment}|{_normalize_feedback(feedback_text)}".encode(), digest_size=16
+            ).digest()
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return ServiceResponse(success=True, data=dict(cached), service_used="openai_cache")
+            
             context = self._build_response_context(sentiment, confidence, key_phrases, opinions)
             prompt = self._create_prompt(feedback_text, context)
 
-            url = f"{self.base_url.rstrip('/')}/v1/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are an expert customer service representative known for empathetic, personalized responses.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                "max_tokens": 200,
-                "temperature": 0.7,
-            }
-
-            resp = requests.post(url, json=payload, headers=headers, timeout=self.timeout_seconds)
-            resp.raise_for_status()
-            data = resp.json()
+            data = self._request_completion(prompt)
 
             choices = data.get("choices", [])
             if not choices:
@@ -81,37 +127,37 @@ class OpenAIResponseService(BaseExternalService):
                 'sentiment_addressed': sentiment,
                 'key_phrases_used': key_phrases[:3],
             }
+            self._response_cache.put(cache_key, response_data)
 
             return ServiceResponse(
                 success=True,
-                data=response_data,
+                data=dict(response_data),
                 service_used="openai"
             )
 
         except Exception as e:
-            logger.error(f"OpenAI response generation error: {str(e)}")
+            logger.error("OpenAI response generation error: %s", e)
             return self._get_fallback_response(feedback_text, sentiment_data)
     
+    @retry_on_failure(max_retries=2, delay=1.0, retry_on=TRANSIENT_HTTP_ERRORS)
+    def _request_completion(self, prompt: str) -> Dict[str, Any]:
+        """POST a chat completion; only rate limits, 5xx and connection errors are retried."""
+        payload = {
+            "model": self.model,
+            "messages": [_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+            "max_tokens": 200,
+            "temperature": 0.7,
+        }
+
+        resp = self.http.post(self._completions_url, json=payload, headers=self._headers, timeout=self.timeout_seconds)
+        if resp.status_code == 429 or resp.status_code >= 500:
+            raise TransientServiceError(f"OpenAI API returned {resp.status_code}")
+        resp.raise_for_status()
+        return resp.json()
+    
     def _create_prompt(self, feedback_text: str, context: str) -> str:
         """Create the prompt for response generation."""
-        return f"""
-        Generate a professional, empathetic customer service response to this feedback.
-        
-        Customer Feedback: "{feedback_text}"
-        
-        Analysis Context:
-        {context}
-        
-        Response Requirements:
-        1. Be genuine and empathetic
-        2. Address the specific sentiment and key points mentioned
-        3. Use appropriate tone for the sentiment level
-        4. Keep response concise but meaningful (2-3 sentences)
-        5. If specific aspects were mentioned, acknowledge them
-        6. Provide appropriate next steps or appreciation
-        
-        Generate only the response text, no additional formatting.
-        """
+        return _PROMPT_TEMPLATE.format(feedback_text=feedback_text, context=context)
     
     def _build_response_context(self, sentiment: str, confidence: float, key_phrases: list, opinions: list) -> str:
         """Build context string for prompt."""
@@ -136,14 +182,8 @@ class OpenAIResponseService(BaseExternalService):
         """Fallback response when OpenAI is not available."""
         sentiment = sentiment_data.get('sentiment', 'neutral')
         
-        responses = {
-            'positive': "Thank you so much for your wonderful feedback! We're thrilled to hear about your positive experience and truly appreciate you taking the time to share it with us.",
-            'negative': "We sincerely appreciate you bringing this to our attention and apologize for any inconvenience you've experienced. Your feedback is invaluable in helping us improve our service.",
-            'neutral': "Thank you for your feedback. We appreciate you taking the time to share your thoughts with us, and we'll use this information to continue improving our service."
-        }
-        
         response_data = {
-            'response_text': responses.get(sentiment, responses['neutral']),
+            'response_text': _FALLBACK_RESPONSES.get(sentiment, _FALLBACK_RESPONSES['neutral']),
             'model_used': 'fallback',
             'tokens_used': 0,
             'sentiment_addressed': sentiment,
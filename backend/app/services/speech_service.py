@@ -1,14 +1,34 @@
 """Azure Speech service for generating emotion-aware audio responses."""
 
 import os
+import shutil
+import hashlib
 import logging
-from typing import Dict, Any
+from bisect import bisect_left
+from queue import Queue, Empty, Full
+from typing import Dict, Any, Tuple
 import azure.cognitiveservices.speech as speechsdk
 from .base import BaseExternalService, retry_on_failure, ServiceResponse
-from .blob_storage import BlobStorageService
+from .blob_storage import get_blob_storage
+from app.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Local synthesis output; files are removed once uploaded to Blob Storage
+AUDIO_DIR = Config.AUDIO_FILES_DIR
+
+# Synthesized audio kept by SSML hash; fallback and cached replies repeat
+# verbatim, so identical speech is linked from here instead of re-synthesized
+AUDIO_CACHE_DIR = os.path.join(AUDIO_DIR, 'tts-cache')
+AUDIO_CACHE_MAX_FILES = int(os.environ.get('AUDIO_CACHE_MAX_FILES', '256'))
+
+# Idle synthesizers kept connected between requests; about one per pipeline worker
+SYNTHESIZER_POOL_SIZE = int(os.environ.get('BG_WORKERS', '4'))
+
+# Confidence steps shared by the voice, style and style-degree choices
+# (each compares with `confidence > threshold`)
+_CONFIDENCE_THRESHOLDS = (0.75, 0.9, 0.95)
+
 
 class AzureSpeechService(BaseExternalService):
     
@@ -16,7 +36,11 @@ class AzureSpeechService(BaseExternalService):
         super().__init__("Azure Speech")
         self.speech_key = os.environ.get('AZURE_SPEECH_KEY')
         self.speech_region = os.environ.get('AZURE_SPEECH_REGION')
-        self.blob_storage = BlobStorageService()
+        # Shared with the audio routes so both use one connection pool
+        self.blob_storage = get_blob_storage()
+        # (sentiment, confidence band) -> (SSML template, voice, style)
+        self._ssml_profiles: Dict[Tuple[str, int], Tuple[str, str, str]] = {}
+        self._synthesizers: Queue = Queue(maxsize=SYNTHESIZER_POOL_SIZE)
         self.initialize()
     
     def _validate_credentials(self) -> bool:
@@ -31,9 +55,10 @@ class AzureSpeechService(BaseExternalService):
                 region=self.speech_region
             )
             self.speech_config.speech_synthesis_voice_name = "en-US-AriaNeural"
+            os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
             return True
         except Exception as e:
-            logger.error(f"Failed to initialize Azure Speech client: {str(e)}")
+            logger.error("Failed to initialize Azure Speech client: %s", e)
             return False
     
     @retry_on_failure(max_retries=1, delay=2.0)  # Lower retries for audio generation
@@ -53,71 +78,43 @@ class AzureSpeechService(BaseExternalService):
             sentiment = sentiment_data.get('sentiment', 'neutral')
             confidence = sentiment_data.get('confidence_score', 0.5)
             
-            ssml = self._create_emotion_ssml(text, sentiment, confidence)
-            
-            audio_dir = '/tmp'
-            audio_path = os.path.join(audio_dir, f'{feedback_id}.mp3')
+            ssml, voice, style = self._create_emotion_ssml(text, sentiment, confidence)
             
-            audio_config = speechsdk.audio.AudioOutputConfig(filename=audio_path)
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
+            audio_path = os.path.join(AUDIO_DIR, f'{feedback_id}.mp3')
+            # The SSML fixes voice, style, prosody and text, i.e. the audio
+            cache_path = os.path.join(
+                AUDIO_CACHE_DIR, hashlib.blake2b(ssml.encode(), digest_size=16).hexdigest() + '.mp3'
             )
+            if self._link_cached_audio(cache_path, audio_path):
+                logger.info("Audio reused from cache: %s", audio_path)
+                return self._store_audio(audio_path, feedback_id, voice, style)
             
+            synthesizer = self._acquire_synthesizer()
             result = synthesizer.speak_ssml_async(ssml).get()
+            # Not returned to the pool if synthesis raised
+            self._release_synthesizer(synthesizer)
             
             if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                file_size = os.path.getsize(audio_path) if os.path.exists(audio_path) else 0
-                
-                logger.info(f"Audio generated successfully: {audio_path} ({file_size} bytes)")
-                logger.info(f"Audio directory: {audio_dir}")
-                logger.info(f"Environment: {os.environ.get('FLASK_ENV', 'development')}")
-                logger.info(f"File exists check: {os.path.exists(audio_path)}")
-                
-                blob_url = None
-                sas_url = None
-                if self.blob_storage.is_available:
-                    blob_result = self.blob_storage.upload_audio_file(audio_path, feedback_id)
-                    if blob_result.success:
-                        blob_url = blob_result.data.get('blob_url')
-                        sas_url = blob_result.data.get('sas_url')
-                        logger.info(f"Audio uploaded to blob storage: {blob_url}")
-                        
-                        try:
-                            os.remove(audio_path)
-                            logger.info(f"Local audio file cleaned up: {audio_path}")
-                        except Exception as e:
-                            logger.warning(f"Failed to clean up local file: {e}")
-                    else:
-                        logger.warning(f"Failed to upload to blob storage: {blob_result.error}")
-                
-                audio_data = {
-                    'file_path': audio_path,
-                    'file_size': file_size,
-                    'voice_used': self._get_voice_for_sentiment(sentiment, confidence),
-                    'emotion_style': self._get_emotion_style(sentiment, confidence),
-                    'ssml_used': True,
-                    'blob_url': blob_url,
-                    'sas_url': sas_url
-                }
-                
-                return ServiceResponse(
-                    success=True,
-                    data=audio_data,
-                    service_used="azure_speech"
-                )
+                # Written aside and renamed in, so a path still linked into
+                # the audio cache is replaced rather than overwritten
+                partial_path = f'{audio_path}.part'
+                with open(partial_path, 'wb') as audio_file:
+                    audio_file.write(result.audio_data)
+                os.replace(partial_path, audio_path)
+                self._cache_audio(audio_path, cache_path)
+                return self._store_audio(audio_path, feedback_id, voice, style)
             elif result.reason == speechsdk.ResultReason.Canceled:
                 cancellation_details = speechsdk.CancellationDetails(result)
-                logger.error(f"Speech synthesis canceled: {cancellation_details.reason}")
+                logger.error("Speech synthesis canceled: %s", cancellation_details.reason)
                 if cancellation_details.reason == speechsdk.CancellationReason.Error:
-                    logger.error(f"Error details: {cancellation_details.error_details}")
+                    logger.error("Error details: %s", cancellation_details.error_details)
                 return ServiceResponse(
                     success=False,
                     error=f"Speech synthesis canceled: {cancellation_details.reason}",
                     service_used="azure_speech"
                 )
             else:
-                logger.error(f"Speech synthesis failed: {result.reason}")
+                logger.error("Speech synthesis failed: %s", result.reason)
                 return ServiceResponse(
                     success=False,
                     error=f"Speech synthesis failed: {result.reason}",
@@ -125,34 +122,143 @@ class AzureSpeechService(BaseExternalService):
                 )
                 
         except Exception as e:
-            logger.error(f"Azure speech synthesis error: {str(e)}")
+            logger.error("Azure speech synthesis error: %s", e)
             return ServiceResponse(
                 success=False,
                 error=str(e),
                 service_used="azure_speech"
             )
     
-    def _create_emotion_ssml(self, text: str, sentiment: str, confidence: float) -> str:
-        """Create SSML with emotion-based styling."""
-        voice = self._get_voice_for_sentiment(sentiment, confidence)
-        style = self._get_emotion_style(sentiment, confidence)
-        style_degree = self._get_style_degree(confidence)
-        prosody_settings = self._get_prosody_for_sentiment(sentiment, confidence)
+    def _acquire_synthesizer(self):
+        """An idle pooled synthesizer, or a new one with its connection opened."""
+        try:
+            return self._synthesizers.get_nowait()
+        except Empty:
+            pass
+        # No audio_config: results come back in memory as result.audio_data
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config, audio_config=None)
+        try:
+            speechsdk.Connection.from_speech_synthesizer(synthesizer).open(True)
+        except Exception as e:
+            logger.debug("Speech pre-connect skipped: %s", e)
+        return synthesizer
+    
+    def _release_synthesizer(self, synthesizer):
+        try:
+            self._synthesizers.put_nowait(synthesizer)
+        except Full:
+            pass
+    
+    def _store_audio(self, audio_path: str, feedback_id: str, voice: str, style: str) -> ServiceResponse:
+        """Upload a finished audio file to Blob Storage (when available) and describe it."""
+        file_size = os.path.getsize(audio_path) if os.path.exists(audio_path) else 0
+        
+        logger.info("Audio generated successfully: %s (%s bytes)", audio_path, file_size)
+        logger.info("Audio directory: %s", AUDIO_DIR)
+        logger.info("Environment: %s", os.environ.get('FLASK_ENV', 'development'))
+        logger.info("File exists check: %s", os.path.exists(audio_path))
+        
+        blob_url = None
+        sas_url = None
+        if self.blob_storage.is_available:
+            blob_result = self.blob_storage.upload_audio_file(audio_path, feedback_id)
+            if blob_result.success:
+                blob_url = blob_result.data.get('blob_url')
+                sas_url = blob_result.data.get('sas_url')
+                logger.info("Audio uploaded to blob storage: %s", blob_url)
+                
+                try:
+                    os.remove(audio_path)
+                    logger.info("Local audio file cleaned up: %s", audio_path)
+                except Exception as e:
+                    logger.warning("Failed to clean up local file: %s", e)
+            else:
+                logger.warning("Failed to upload to blob storage: %s", blob_result.error)
+        
+        audio_data = {
+            'file_path': audio_path,
+            'file_size': file_size,
+            'voice_used': voice,
+            'emotion_style': style,
+            'ssml_used': True,
+            'blob_url': blob_url,
+            'sas_url': sas_url
+        }
+        
+        return ServiceResponse(
+            success=True,
+            data=audio_data,
+            service_used="azure_speech"
+        )
+    
+    def _link_cached_audio(self, cache_path: str, audio_path: str) -> bool:
+        """Place a cached rendering at `audio_path`; False on a cache miss."""
+        try:
+            # Refresh the mtime that eviction orders by
+            os.utime(cache_path)
+            if os.path.exists(audio_path):
+                os.remove(audio_path)
+            os.link(cache_path, audio_path)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            shutil.copyfile(cache_path, audio_path)
+        return True
+    
+    def _cache_audio(self, audio_path: str, cache_path: str):
+        """Keep a link to freshly synthesized audio and evict the oldest entries."""
+        try:
+            os.link(audio_path, cache_path)
+        except FileExistsError:
+            return
+        except OSError as e:
+            logger.warning("Failed to cache synthesized audio: %s", e)
+            return
+        
+        try:
+            entries = list(os.scandir(AUDIO_CACHE_DIR))
+            if len(entries) <= AUDIO_CACHE_MAX_FILES:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - AUDIO_CACHE_MAX_FILES]:
+                os.remove(entry.path)
+        except OSError as e:
+            # Another worker evicting concurrently; the cache is only trimmed late
+            logger.debug("Audio cache eviction skipped: %s", e)
+    
+    def _create_emotion_ssml(self, text: str, sentiment: str, confidence: float) -> Tuple[str, str, str]:
+        """Create SSML with emotion-based styling; returns (ssml, voice, style)."""
+        template, voice, style = self._get_ssml_profile(sentiment, confidence)
+        return template.format(text=self._escape_ssml_text(text)), voice, style
+    
+    def _get_ssml_profile(self, sentiment: str, confidence: float) -> Tuple[str, str, str]:
+        """SSML template (with a `{text}` slot), voice and style for a sentiment and confidence.
         
-        ssml = f"""
+        The voice/style helpers below all step at the same confidence
+        thresholds, so a profile is built once per (sentiment, band).
+        """
+        key = (sentiment, bisect_left(_CONFIDENCE_THRESHOLDS, confidence))
+        profile = self._ssml_profiles.get(key)
+        if profile is None:
+            voice = self._get_voice_for_sentiment(sentiment, confidence)
+            style = self._get_emotion_style(sentiment, confidence)
+            style_degree = self._get_style_degree(confidence)
+            prosody_settings = self._get_prosody_for_sentiment(sentiment, confidence)
+            
+            template = f"""
         <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" 
                xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="en-US">
             <voice name="{voice}">
                 <mstts:express-as style="{style}" styledegree="{style_degree}">
                     <prosody rate="{prosody_settings['rate']}" pitch="{prosody_settings['pitch']}">
-                        {self._escape_ssml_text(text)}
+                        {{text}}
                     </prosody>
                 </mstts:express-as>
             </voice>
         </speak>
-        """
-        
-        return ssml.strip()
+        """.strip()
+            profile = self._ssml_profiles[key] = (template, voice, style)
+        return profile
     
     def _get_voice_for_sentiment(self, sentiment: str, confidence: float) -> str:
         """Select appropriate voice based on sentiment with proper voice names."""
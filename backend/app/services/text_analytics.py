@@ -2,10 +2,12 @@
 
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
 from azure.ai.textanalytics import TextAnalyticsClient
-from .base import BaseExternalService, retry_on_failure, ServiceResponse
+from .base import BaseExternalService, retry_on_failure, ServiceResponse, get_http_session
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,7 @@ class AzureTextAnalyticsService(BaseExternalService):
         super().__init__("Azure Text Analytics")
         self.endpoint = os.environ.get('AZURE_TEXT_ANALYTICS_ENDPOINT')
         self.key = os.environ.get('AZURE_TEXT_ANALYTICS_KEY')
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="text-analytics")
         self.initialize()
     
     def _validate_credentials(self) -> bool:
@@ -27,11 +30,12 @@ class AzureTextAnalyticsService(BaseExternalService):
         try:
             self.client = TextAnalyticsClient(
                 endpoint=self.endpoint,
-                credential=AzureKeyCredential(self.key)
+                credential=AzureKeyCredential(self.key),
+                transport=RequestsTransport(session=get_http_session(), session_owner=False)
             )
             return True
         except Exception as e:
-            logger.error(f"Failed to initialize Azure Text Analytics client: {str(e)}")
+            logger.error("Failed to initialize Azure Text Analytics client: %s", e)
             return False
     
     @retry_on_failure(max_retries=2, delay=1.0)
@@ -45,6 +49,10 @@ class AzureTextAnalyticsService(BaseExternalService):
         
         try:
             documents = [text]
+            # The two calls are independent; overlap their round-trips
+            key_phrases_future = self._executor.submit(
+                self.client.extract_key_phrases, documents, language="en"
+            )
             result = self.client.analyze_sentiment(
                 documents, 
                 show_opinion_mining=True,
@@ -54,12 +62,12 @@ class AzureTextAnalyticsService(BaseExternalService):
             if result and not result[0].is_error:
                 doc = result[0]
                 
-                key_phrases_result = self.client.extract_key_phrases(documents, language="en")
+                key_phrases_result = key_phrases_future.result()
                 key_phrases = key_phrases_result[0].key_phrases if key_phrases_result and not key_phrases_result[0].is_error else []
                 
                 sentiment_data = self._build_sentiment_data(doc, key_phrases)
                 
-                logger.info(f"Sentiment analysis completed: {doc.sentiment} ({sentiment_data['confidence_score']:.2f})")
+                logger.info("Sentiment analysis completed: %s (%.2f)", doc.sentiment, sentiment_data['confidence_score'])
                 return ServiceResponse(
                     success=True,
                     data=sentiment_data,
@@ -70,7 +78,7 @@ class AzureTextAnalyticsService(BaseExternalService):
                 return self._get_fallback_sentiment(text)
                 
         except Exception as e:
-            logger.error(f"Azure Text Analytics error: {str(e)}")
+            logger.error("Azure Text Analytics error: %s", e)
             return self._get_fallback_sentiment(text)
     
     def _build_sentiment_data(self, doc, key_phrases: list) -> Dict[str, Any]:
@@ -85,7 +93,7 @@ class AzureTextAnalyticsService(BaseExternalService):
                 'neutral': doc.confidence_scores.neutral
             }
             final_sentiment = max(scores, key=scores.get)
-            logger.info(f"Mixed sentiment detected, mapped to {final_sentiment} based on confidence scores: {scores}")
+            logger.info("Mixed sentiment detected, mapped to %s based on confidence scores: %s", final_sentiment, scores)
         
         confidence_score = getattr(doc.confidence_scores, final_sentiment, 0.0)
         
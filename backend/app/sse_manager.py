@@ -1,21 +1,50 @@
 """Server-Sent Events manager for real-time feedback updates."""
 
-import json
+import orjson
 import logging
 import queue
 import threading
 import time
-from typing import Dict
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from app.json_provider import ORJSON_OPTIONS
 from app.models import Feedback
 
 logger = logging.getLogger(__name__)
 
+HEARTBEAT_INTERVAL = 30
+# Events queued within this window are written to the socket together
+FLUSH_INTERVAL = 0.02
+MAX_EVENTS_PER_FLUSH = 50
+# Redis channel carrying encoded frames between processes when fan-out is configured
+FANOUT_CHANNEL = 'feedback:events'
+
+
+def sse_frame(data: dict) -> bytes:
+    """Encode a payload as a complete SSE `data:` frame."""
+    return b"data: " + orjson.dumps(data, option=ORJSON_OPTIONS) + b"\n\n"
+
+
+# Sent as-is at the start of every stream and on idle queues; the frontend's
+# inactivity watchdog only sees `data:` messages, so heartbeats aren't comments
+CONNECTED_FRAME = sse_frame({'type': 'connected', 'message': 'SSE connection established'})
+HEARTBEAT_FRAME = sse_frame({'type': 'heartbeat'})
+
 class SSEManager:
     
     def __init__(self):
         self.clients: Dict[str, 'SSEClient'] = {}
         self.client_counter = 0
-        self.lock = threading.Lock()
+        # Re-entrant: clients may be removed while a broadcast holds the lock
+        self.lock = threading.RLock()
+        self._pending = threading.local()
+        self._redis = None
+        self._subscriber: Optional[threading.Thread] = None
+        
+    def configure_fanout(self, redis_url: str):
+        """Route broadcasts through Redis Pub/Sub so clients of every worker receive them."""
+        import redis
+        self._redis = redis.Redis.from_url(redis_url)
         
     def add_client(self) -> 'SSEClient':
         """Add a new SSE client."""
@@ -24,11 +53,8 @@ class SSEManager:
             self.client_counter += 1
             client = SSEClient(client_id, self)
             self.clients[client_id] = client
-            logger.info(f"New SSE client {client_id} connected. Total: {len(self.clients)}")
-            try:
-                client.send_event({'type': 'connected', 'message': 'SSE connection established'})
-            except Exception:
-                pass
+            logger.info("New SSE client %s connected. Total: %s", client_id, len(self.clients))
+            self._ensure_subscriber()
             return client
         
     def remove_client(self, client_id: str):
@@ -36,40 +62,131 @@ class SSEManager:
         with self.lock:
             if client_id in self.clients:
                 del self.clients[client_id]
-                logger.info(f"SSE client {client_id} disconnected. Total: {len(self.clients)}")
+                logger.info("SSE client %s disconnected. Total: %s", client_id, len(self.clients))
         
+    def has_subscribers(self) -> bool:
+        """Whether any SSE client is currently connected."""
+        # Clients of other workers aren't visible from here
+        return self._redis is not None or bool(self.clients)
+    
     def send_feedback_update(self, feedback: Feedback):
         """Send feedback update to all connected clients."""
+        self.send_feedback_updates([feedback])
+    
+    def send_feedback_updates(self, feedbacks: List[Feedback]):
+        """Send updates for several feedback items in one fan-out pass."""
         from app.serializers import serialize_feedback
 
-        event_data = {
-            'type': 'feedback_update',
-            'data': serialize_feedback(feedback)
-        }
+        self._broadcast([
+            {'type': 'feedback_update', 'data': serialize_feedback(feedback)}
+            for feedback in feedbacks
+        ])
+    
+    def queue_feedback_update(self, session, feedback: Feedback):
+        """Stage a feedback update to be sent once `session` commits.
         
+        The payload is serialized now because no SQL can be emitted from
+        the after_commit hook.
+        """
+        from app.serializers import serialize_feedback
+
+        session.flush()
+        self._pending_events().append(
+            {'type': 'feedback_update', 'data': serialize_feedback(feedback)}
+        )
+    
+    def register_session_hooks(self, session):
+        """Flush staged updates after commit and drop them on rollback."""
+        event.listen(session, 'after_commit', lambda s: self._flush_after_commit())
+        event.listen(session, 'after_soft_rollback', lambda s, previous: self.discard_pending())
+    
+    def _flush_after_commit(self):
+        """after_commit hook: the data is already durable, so a failed notification must not fail commit()."""
+        try:
+            self.flush_pending()
+        except Exception as e:
+            self.discard_pending()
+            logger.error("Failed to send SSE updates after commit: %s", e)
+    
+    def flush_pending(self):
+        """Send updates staged on this thread by `queue_feedback_update`."""
+        events = self._pending_events()
+        if events:
+            self._pending.events = []
+            self._broadcast(events)
+    
+    def discard_pending(self):
+        """Drop updates staged on this thread without sending them."""
+        self._pending.events = []
+    
+    def _pending_events(self) -> List[dict]:
+        if not hasattr(self._pending, 'events'):
+            self._pending.events = []
+        return self._pending.events
+    
+    def _broadcast(self, events: List[dict]):
+        """Fan out events to all connected clients, encoding each only once."""
+        frames = [sse_frame(event_data) for event_data in events]
+        if self._redis is not None:
+            try:
+                # Every subscribed process, this one included, delivers to its own clients
+                self._redis.publish(FANOUT_CHANNEL, b''.join(frames))
+                return
+            except Exception as e:
+                logger.error("Failed to publish SSE events, delivering locally only: %s", e)
+        
+        if not self.clients:
+            logger.warning("No SSE clients connected to receive updates for %s feedback item(s)", len(events))
+            return
+        self._deliver(frames)
+    
+    def _deliver(self, frames: List[bytes]):
+        """Queue encoded frames on every client connected to this process."""
         with self.lock:
             if not self.clients:
-                logger.warning(f"No SSE clients connected to receive feedback update for {feedback.id}")
                 return
-                
+            
+            # Iterate a snapshot and remove afterwards: a client dropped mid-loop
+            # must not stop the others from receiving the frames
             disconnected_clients = [
-                client_id for client_id, client in self.clients.items()
-                if not self._send_event_to_client(client, event_data)
+                client_id for client_id, client in list(self.clients.items())
+                if not self._send_frames_to_client(client, frames)
             ]
             
             for client_id in disconnected_clients:
                 self.remove_client(client_id)
                 
-            logger.info(f"Sent feedback update for {feedback.id} to {len(self.clients)} clients")
+            logger.info("Sent %s frame(s) to %s clients", len(frames), len(self.clients))
+    
+    def _ensure_subscriber(self):
+        """Start this process's Redis subscriber once it has a client to serve."""
+        if self._redis is None or (self._subscriber and self._subscriber.is_alive()):
+            return
+        # Started lazily so each forked gunicorn worker gets its own thread
+        self._subscriber = threading.Thread(target=self._subscribe_loop, name="sse-fanout", daemon=True)
+        self._subscriber.start()
+    
+    def _subscribe_loop(self):
+        """Relay frames published on FANOUT_CHANNEL to local clients, resubscribing on errors."""
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(FANOUT_CHANNEL)
+                for message in pubsub.listen():
+                    self._deliver([message['data']])
+            except Exception as e:
+                logger.error("SSE fan-out subscription lost, retrying: %s", e)
+                time.sleep(1)
     
-    def _send_event_to_client(self, client, event_data):
-        """Send event to a single client. Returns False if client disconnected."""
+    def _send_frames_to_client(self, client, frames: List[bytes]) -> bool:
+        """Send encoded frames to a single client. Returns False if client disconnected."""
         try:
-            client.send_event(event_data)
-            return True
+            for frame in frames:
+                client.send_frame(frame)
         except Exception as e:
-            logger.warning(f"Failed to send event to client {client.client_id}: {str(e)}")
+            logger.warning("Failed to send event to client %s: %s", client.client_id, e)
             return False
+        return client.is_connected
 
 class SSEClient:
     
@@ -81,31 +198,51 @@ class SSEClient:
         
     def send_event(self, data: dict):
         """Send an event to this client."""
+        self.send_frame(sse_frame(data))
+    
+    def send_frame(self, frame: bytes):
+        """Queue an already encoded SSE frame for this client.
+        
+        A full queue only marks the client disconnected; the manager removes
+        it once the current delivery pass is done.
+        """
         if not self.is_connected:
             return
-            
-        json_data = json.dumps(data)
-        event = f"data: {json_data}\n\n"
         
         try:
-            self.message_queue.put(event, block=False)
+            self.message_queue.put(frame, block=False)
         except queue.Full:
-            self.disconnect()
+            logger.warning("SSE client %s is not keeping up; disconnecting", self.client_id)
+            self.is_connected = False
             
     def get_events(self):
         """Generator for SSE events."""
         try:
             while self.is_connected:
                 try:
-                    event = self.message_queue.get(timeout=30)
-                    yield event
+                    event = self.message_queue.get(timeout=HEARTBEAT_INTERVAL)
+                    yield self._coalesce(event)
                 except queue.Empty:
-                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': time.time()})}\n\n"
+                    yield HEARTBEAT_FRAME
         except Exception as e:
-            logger.error(f"Error in SSE event generator for {self.client_id}: {str(e)}")
+            logger.error("Error in SSE event generator for %s: %s", self.client_id, e)
         finally:
             self.disconnect()
         
+    def _coalesce(self, first_event: bytes) -> bytes:
+        """Join events arriving within FLUSH_INTERVAL into a single write."""
+        buffer = [first_event]
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(buffer) < MAX_EVENTS_PER_FLUSH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                buffer.append(self.message_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return b''.join(buffer)
+        
     def disconnect(self):
         """Mark client as disconnected and remove from manager."""
         self.is_connected = False
@@ -1,10 +1,14 @@
 """Input validation utilities."""
 
 import re
+from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 from functools import wraps
 from flask import request, jsonify
 
+# Canonical hyphenated UUID form, as stored by generate_uuid()
+UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.I)
+
 
 class ValidationError(Exception):
     
@@ -114,6 +118,24 @@ class QueryValidator:
         
         return page, per_page
     
+    @classmethod
+    def validate_cursor(cls, cursor: Any) -> Optional[Tuple[datetime, str]]:
+        """Parse a `<created_at ISO>_<id>` keyset cursor; empty means the first page."""
+        if not cursor:
+            return None
+        
+        created_at, _, feedback_id = str(cursor).rpartition('_')
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            raise ValidationError("Invalid pagination cursor", field="cursor", code="INVALID_CURSOR")
+        
+        if not UUID_RE.fullmatch(feedback_id):
+            raise ValidationError("Invalid pagination cursor", field="cursor", code="INVALID_CURSOR")
+        
+        # Stored ids are lowercase; the (created_at, id) comparison is case-sensitive
+        return created_at, feedback_id.lower()
+    
     @classmethod
     def validate_category_filter(cls, category: Any) -> Optional[str]:
         """Validate category filter parameter."""
@@ -6,8 +6,11 @@ if os.environ.get('FLASK_ENV') != 'production':
     backend_dir = os.path.dirname(os.path.abspath(__file__))
     root_dir = os.path.dirname(backend_dir)
     
-    load_dotenv(os.path.join(root_dir, '.env.local'))
-    load_dotenv(os.path.join(root_dir, '.env'))
+    # Parse .env files once; forked or re-importing workers inherit os.environ
+    if not os.environ.get('BFA_DOTENV_LOADED'):
+        load_dotenv(os.path.join(root_dir, '.env.local'))
+        load_dotenv(os.path.join(root_dir, '.env'))
+        os.environ['BFA_DOTENV_LOADED'] = '1'
     
     required_vars = [
         'SECRET_KEY',
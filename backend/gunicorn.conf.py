@@ -0,0 +1,41 @@
+"""Gunicorn configuration for production.
+
+The app is imported once in the master (preload_app) so workers share its
+code pages copy-on-write. Threads and pooled DB/HTTP connections do not
+survive fork(), so each worker starts its own background processor and
+discards the inherited connection pools in post_fork.
+"""
+
+import os
+
+# Read by create_app() in the master; workers start the processor in post_fork
+os.environ['BACKGROUND_PROCESSOR_AUTOSTART'] = 'false'
+
+bind = '0.0.0.0:8080'
+workers = 1
+worker_class = 'gthread'
+# Each open SSE stream parks one thread (blocked on its queue, holding no
+# DB connection), so size the pool for dashboards plus regular API traffic
+threads = int(os.environ.get('GUNICORN_THREADS', '32'))
+timeout = 120
+keepalive = 120
+preload_app = True
+# Serve wsgi.file_wrapper responses (local audio via send_file) with sendfile(2)
+sendfile = True
+
+
+def post_fork(server, worker):
+    from application import app
+    from app import db
+    from app.background_processor import background_processor
+    from app.services.base import reset_http_session
+
+    with app.app_context():
+        # Keep the parent's connections open; only drop them from this worker's pool
+        db.engine.dispose(close=False)
+    # Keep-alive sockets to Azure/OpenAI opened by the master (e.g. the blob probe)
+    reset_http_session()
+
+    # Feedback is queued in-process by the worker that accepted it,
+    # so every worker needs its own processor thread
+    background_processor.start()
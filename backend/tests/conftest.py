@@ -0,0 +1,31 @@
+import os
+
+os.environ['FLASK_ENV'] = 'testing'
+os.environ['BACKGROUND_PROCESSOR_AUTOSTART'] = 'false'
+
+import pytest
+
+from app import create_app, db
+from app.models import Feedback
+
+
+@pytest.fixture(scope='session')
+def app():
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_feedback(app):
+    """Insert feedback rows directly, bypassing the processing queue."""
+    def _make_feedback(text='The service was quick and the staff were friendly.', category='service', **fields):
+        with app.app_context():
+            feedback = Feedback(text=text, category=category, **fields)
+            db.session.add(feedback)
+            db.session.commit()
+            return feedback.id
+    return _make_feedback
@@ -0,0 +1,68 @@
+"""Range handling when serving generated audio."""
+
+import os
+
+import pytest
+
+from app import db, routes
+from app.models import AudioFile
+from app.services.base import ServiceResponse
+from app.services.speech_service import AUDIO_DIR
+
+AUDIO_BYTES = bytes(range(10))
+
+RANGE_CASES = [
+    # (Range header, status, body)
+    ('bytes=2-5', 206, AUDIO_BYTES[2:6]),
+    ('bytes=50-60', 416, b''),
+    ('bytes=0-1,4-5', 200, AUDIO_BYTES),
+    ('bytes=oops', 200, AUDIO_BYTES),
+]
+
+
+class FakeBlobStorage:
+    is_available = True
+
+    def stream_blob(self, feedback_id, offset=None, length=None):
+        start = offset or 0
+        data = AUDIO_BYTES[start:start + length] if length is not None else AUDIO_BYTES
+        return ServiceResponse(success=True, data={'chunks': iter([data]), 'size': len(data)})
+
+
+@pytest.fixture
+def audio_id(app, make_feedback):
+    feedback_id = make_feedback()
+    file_path = os.path.join(AUDIO_DIR, f'test_{feedback_id}.mp3')
+    with open(file_path, 'wb') as f:
+        f.write(AUDIO_BYTES)
+    with app.app_context():
+        audio_file = AudioFile(feedback_id=feedback_id, file_path=file_path, file_size=len(AUDIO_BYTES))
+        db.session.add(audio_file)
+        db.session.commit()
+        audio_id = audio_file.id
+    yield audio_id
+    os.remove(file_path)
+
+
+@pytest.mark.parametrize('range_header, status, body', RANGE_CASES)
+def test_local_audio_ranges(client, audio_id, range_header, status, body):
+    response = client.get(f'/api/v1/audio/{audio_id}', headers={'Range': range_header})
+
+    assert response.status_code == status
+    if status == 416:
+        assert response.headers['Content-Range'] == f'bytes */{len(AUDIO_BYTES)}'
+    else:
+        assert response.data == body
+
+
+@pytest.mark.parametrize('range_header, status, body', RANGE_CASES)
+def test_blob_audio_ranges(client, audio_id, monkeypatch, range_header, status, body):
+    monkeypatch.setattr(routes, 'get_blob_storage', FakeBlobStorage)
+
+    response = client.get(f'/api/v1/audio/{audio_id}', headers={'Range': range_header})
+
+    assert response.status_code == status
+    if status == 416:
+        assert response.headers['Content-Range'] == f'bytes */{len(AUDIO_BYTES)}'
+    else:
+        assert response.data == body
@@ -0,0 +1,47 @@
+"""Scheduling of queued feedback onto the worker pool."""
+
+import threading
+import time
+
+import pytest
+
+from app.background_processor import BackgroundProcessor, MAX_WORKERS
+
+
+@pytest.fixture
+def processor(app):
+    processor = BackgroundProcessor()
+    processor.set_app(app)
+    processor.start()
+    yield processor
+    processor.stop()
+
+
+@pytest.mark.skipif(MAX_WORKERS < 2, reason='needs a free worker next to the slow item')
+def test_slow_item_does_not_hold_back_later_items(processor, monkeypatch):
+    slow_started = threading.Event()
+    release_slow = threading.Event()
+    done = []
+
+    def process(feedback_id):
+        if feedback_id == 'slow':
+            slow_started.set()
+            release_slow.wait(timeout=5)
+        done.append(feedback_id)
+        return True
+
+    monkeypatch.setattr(processor.feedback_processor, 'process_feedback_complete', process)
+
+    processor.queue_feedback_processing('slow')
+    assert slow_started.wait(timeout=5)
+    for feedback_id in ('a', 'b', 'c'):
+        processor.queue_feedback_processing(feedback_id)
+
+    deadline = time.monotonic() + 5
+    while len(done) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(done) == ['a', 'b', 'c']
+
+    release_slow.set()
+    processor.processing_queue.join()
+    assert done[-1] == 'slow'
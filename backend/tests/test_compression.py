@@ -0,0 +1,16 @@
+"""Responses sent to clients that accept compressed encodings."""
+
+ACCEPT_COMPRESSED = {'Accept-Encoding': 'gzip, br'}
+
+
+def test_feedback_list_is_streamed_uncompressed(client, make_feedback):
+    for _ in range(20):
+        make_feedback()
+
+    response = client.get('/api/v1/feedback?per_page=20', headers=ACCEPT_COMPRESSED, buffered=False)
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert 'Content-Encoding' not in response.headers
+    assert 'Content-Length' not in response.headers
+    assert len(response.get_json()['data']) == 20
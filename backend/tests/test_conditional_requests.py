@@ -0,0 +1,44 @@
+"""Revalidation with If-None-Match, including compressed-variant ETags."""
+
+ACCEPT_COMPRESSED = {'Accept-Encoding': 'gzip, br'}
+
+
+def _revalidate(client, url, headers=None):
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    second = client.get(url, headers={**(headers or {}), 'If-None-Match': etag})
+    return first, second
+
+
+def test_feedback_detail_revalidates(client, make_feedback):
+    _, second = _revalidate(client, f'/api/v1/feedback/{make_feedback()}')
+
+    assert second.status_code == 304
+
+
+def test_compressed_feedback_detail_revalidates(client, make_feedback):
+    first, second = _revalidate(client, f'/api/v1/feedback/{make_feedback("x" * 2000)}', ACCEPT_COMPRESSED)
+
+    assert first.headers['Content-Encoding'] == 'br'
+    assert first.headers['ETag'].endswith(':br"')
+    assert second.status_code == 304
+    assert second.headers['ETag'] == first.headers['ETag']
+
+
+def test_compressed_dashboard_stats_revalidate(client, make_feedback):
+    for _ in range(5):
+        make_feedback()
+
+    first, second = _revalidate(client, '/api/v1/dashboard/stats', ACCEPT_COMPRESSED)
+
+    assert first.headers['Content-Encoding'] == 'br'
+    assert second.status_code == 304
+    assert second.headers['ETag'] == first.headers['ETag']
+
+
+def test_feedback_timestamps_are_utc_iso_strings(client, make_feedback):
+    data = client.get(f'/api/v1/feedback/{make_feedback()}').get_json()['data']
+
+    assert data['created_at'].endswith('+00:00')
+    assert data['updated_at'].endswith('+00:00')
@@ -0,0 +1,27 @@
+"""Feedback submission when the processing queue is full."""
+
+from queue import Queue
+
+from app import db
+from app.background_processor import background_processor
+from app.models import Feedback
+
+
+def test_full_queue_returns_503_and_fails_the_row(app, client, monkeypatch):
+    full_queue = Queue(maxsize=1)
+    full_queue.put_nowait('queued-earlier')
+    monkeypatch.setattr(background_processor, 'processing_queue', full_queue)
+
+    response = client.post('/api/v1/feedback', json={
+        'text': 'Delivery took far longer than promised.',
+        'category': 'billing',
+    })
+
+    assert response.status_code == 503
+    assert response.get_json()['code'] == 'QUEUE_FULL'
+    assert response.headers['Retry-After'] == '5'
+    with app.app_context():
+        statuses = db.session.execute(
+            db.select(Feedback.processing_status).where(Feedback.text == 'Delivery took far longer than promised.')
+        ).scalars().all()
+    assert statuses == ['failed']
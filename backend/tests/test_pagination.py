@@ -0,0 +1,45 @@
+"""Keyset (cursor) pagination of the feedback list."""
+
+from datetime import datetime
+
+import pytest
+
+from app.validators import QueryValidator, ValidationError
+
+FEEDBACK_ID = '0192f3a4-5b6c-7d8e-9f01-23456789abcd'
+
+
+def test_cursor_accepts_uppercase_id_like_the_id_routes():
+    created_at, feedback_id = QueryValidator.validate_cursor(f'2026-10-16T03:35:19.270485_{FEEDBACK_ID.upper()}')
+
+    assert created_at.isoformat() == '2026-10-16T03:35:19.270485'
+    assert feedback_id == FEEDBACK_ID
+
+
+def test_cursor_rejects_malformed_id():
+    with pytest.raises(ValidationError):
+        QueryValidator.validate_cursor('2026-10-16T03:35:19.270485_not-a-uuid')
+
+
+def test_cursor_pages_walk_the_list_in_keyset_order(client, make_feedback):
+    tied = datetime(2026, 1, 2, 12, 0, 0)
+    rows = [
+        (make_feedback(category='technical', created_at=created_at), created_at)
+        for created_at in (datetime(2026, 1, 1), tied, tied, tied, datetime(2026, 1, 3))
+    ]
+    expected = [feedback_id for feedback_id, _ in sorted(rows, key=lambda row: (row[1], row[0]), reverse=True)]
+
+    seen, cursor, pages = [], '', 0
+    while cursor is not None:
+        response = client.get('/api/v1/feedback', query_string={
+            'category': 'technical', 'per_page': 2, 'cursor': cursor,
+        })
+        assert response.status_code == 200
+        body = response.get_json()
+        seen += [item['id'] for item in body['data']]
+        cursor = body['pagination']['next_cursor']
+        assert body['pagination']['has_next'] is (cursor is not None)
+        pages += 1
+
+    assert seen == expected
+    assert pages == 3
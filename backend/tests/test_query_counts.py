@@ -0,0 +1,30 @@
+"""SQL statements per request, counted by the register_query_counter listener.
+
+A jump in any of these usually means an N+1 regression.
+"""
+
+import pytest
+from flask import g
+
+# Flat list query (row count in a window column); detail is the row plus one
+# selectinload per relation; stats is one UNION query (new rows invalidate its cache)
+STATEMENT_BUDGETS = [
+    ('/api/v1/feedback?per_page=10', 1),
+    ('/api/v1/feedback?page=2&per_page=2', 1),
+    ('/api/v1/feedback?cursor=&per_page=10', 1),
+    ('/api/v1/feedback/{feedback_id}', 4),
+    ('/api/v1/dashboard/stats', 1),
+]
+
+
+@pytest.mark.parametrize('url, budget', STATEMENT_BUDGETS)
+def test_statement_budget(app, client, make_feedback, url, budget):
+    feedback_ids = [make_feedback() for _ in range(5)]
+
+    with client:
+        response = client.get(url.format(feedback_id=feedback_ids[0]))
+        assert response.status_code == 200
+        count = g.get('sql_statement_count', 0)
+
+    assert 0 < count <= budget
+    assert budget <= app.config['SQL_STATEMENT_WARN_THRESHOLD']
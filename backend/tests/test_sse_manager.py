@@ -0,0 +1,68 @@
+"""Fan-out of SSE frames to connected clients."""
+
+from datetime import datetime
+
+from app import db
+from app.models import Feedback
+from app.queries import get_feedback_with_relations
+from app.sse_manager import SSEManager, sse_frame, sse_manager
+
+
+def _fill(client):
+    while not client.message_queue.full():
+        client.message_queue.put_nowait(b'backlog')
+
+
+def test_full_client_is_dropped_without_starving_the_others():
+    manager = SSEManager()
+    stalled = manager.add_client()
+    healthy = manager.add_client()
+    _fill(stalled)
+
+    manager._deliver([sse_frame({'type': 'feedback_update'})])
+
+    assert list(manager.clients) == [healthy.client_id]
+    assert not stalled.is_connected
+    assert healthy.message_queue.get_nowait() == sse_frame({'type': 'feedback_update'})
+
+
+def test_failed_broadcast_does_not_fail_the_commit(app, make_feedback, monkeypatch):
+    def broken_deliver(frames):
+        raise RuntimeError('dictionary changed size during iteration')
+
+    feedback_id = make_feedback()
+    client = sse_manager.add_client()
+    monkeypatch.setattr(sse_manager, '_deliver', broken_deliver)
+    try:
+        with app.app_context():
+            feedback = get_feedback_with_relations(feedback_id)
+            feedback.processing_status = 'completed'
+            sse_manager.queue_feedback_update(db.session, feedback)
+            db.session.commit()
+
+        with app.app_context():
+            assert db.session.get(Feedback, feedback_id).processing_status == 'completed'
+        assert sse_manager._pending_events() == []
+    finally:
+        sse_manager.remove_client(client.client_id)
+
+
+def test_full_client_does_not_fail_the_commit(app, make_feedback):
+    feedback_id = make_feedback()
+    stalled = sse_manager.add_client()
+    _fill(stalled)
+    with app.app_context():
+        feedback = get_feedback_with_relations(feedback_id)
+        feedback.processing_status = 'completed'
+        sse_manager.queue_feedback_update(db.session, feedback)
+        db.session.commit()
+
+    assert stalled.client_id not in sse_manager.clients
+    with app.app_context():
+        assert db.session.get(Feedback, feedback_id).processing_status == 'completed'
+
+
+def test_frames_encode_naive_timestamps_as_utc():
+    frame = sse_frame({'created_at': datetime(2026, 10, 16, 3, 35, 19, 270485)})
+
+    assert frame == b'data: {"created_at":"2026-10-16T03:35:19.270485+00:00"}\n\n'
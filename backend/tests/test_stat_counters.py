@@ -0,0 +1,49 @@
+"""Startup backfill and manual rebuild of the dashboard counters."""
+
+from app import db
+from app.models import Feedback, FeedbackStatCounter
+from app.queries import backfill_stat_counters
+
+
+def _category_counters():
+    return dict(
+        db.session.query(FeedbackStatCounter.label, FeedbackStatCounter.count)
+        .filter(FeedbackStatCounter.kind == 'category')
+        .all()
+    )
+
+
+def _category_totals():
+    return dict(
+        db.session.query(Feedback.category, db.func.count())
+        .group_by(Feedback.category)
+        .all()
+    )
+
+
+def test_backfill_fills_empty_counters_only(app, make_feedback):
+    make_feedback(category='product')
+    with app.app_context():
+        db.session.query(FeedbackStatCounter).delete()
+        db.session.commit()
+
+        backfill_stat_counters()
+        assert _category_counters() == _category_totals()
+
+        db.session.query(FeedbackStatCounter).update({'count': 999})
+        db.session.commit()
+        backfill_stat_counters()
+        assert set(_category_counters().values()) == {999}
+
+
+def test_rebuild_command_recounts(app, make_feedback):
+    make_feedback(category='support')
+    with app.app_context():
+        db.session.query(FeedbackStatCounter).update({'count': 999})
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['rebuild-stat-counters'])
+
+    assert result.exit_code == 0
+    with app.app_context():
+        assert _category_counters() == _category_totals()